@@ -1,41 +1,69 @@
+import random
 from minimax_agent import * 
-from minimax_agent import State
+from bitboard import BitboardState, BOARD_SIZES
+from search import ASPIRATION_WINDOW
+from instrumentation import new_search, timed_root
+from solver import ProofNumberSearch, WIN, SOLVER_PIECES, SOLVER_NODES
  #importing utilities and classes from minimax_agent
 
 #simple constants for  the score boundaries
 MAX_SCORE = float('inf')
 MIN_SCORE = float('-inf')
 
-def timing_wrapper(func):
-    #a simple timing decorator
-    def wrapper(*args, **kwargs):
-        import time
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        args[0].search_time += end - start
-        return result
-    return wrapper
-
 class ImprovedSearchAgent:
 
     #a chess-like game AI using alpha-beta pruning
-    def __init__(self, board, current_player, max_depth, scoring_func, board_type=0):
+    def __init__(self, board, current_player, max_depth, scoring_func, board_type=0, in_place=False, tt=None,
+                 time_limit=None, quiescence=False, pvs=False, lmr=False, futility=False, threats=False,
+                 tablebase=None, book=None, book_random=False, solver=False, solver_pieces=SOLVER_PIECES,
+                 solver_nodes=SOLVER_NODES, instrumentation=None):
         self.board = board
+        #seconds per move; iterative deepening up to max_depth instead of one fixed-depth search
+        self.time_limit = time_limit
+        self.depth_reached = 0
+        #search captures and moves onto the last two rows past max_depth (in-place search only)
+        self.quiescence = quiescence
+        #principal variation search, with aspiration windows when deepening iteratively
+        self.pvs = pvs
+        #late-move reductions and futility pruning of quiet moves
+        self.lmr = lmr
+        self.futility = futility
+        #runner and goal-threat detection: decided races score near a win, threats extend the search
+        self.threats = threats
+        #endgame Tablebase (tablebase.py) probed by the search for positions with few pieces
+        self.tablebase = tablebase
+        #OpeningBook (book.py) played without searching while it has the position; book_random picks by weight
+        self.book = book
+        self.book_random = book_random
+        #with at most solver_pieces pieces left, the proof-number solver (solver.py) runs first for up to
+        #solver_nodes nodes and a proven win is played without searching; solver_result keeps (result, line)
+        self.solver = solver
+        self.solver_pieces = solver_pieces
+        self.solver_nodes = solver_nodes
+        self.solver_result = None
+        self.search_stats = {}
+        self.in_place = (in_place or tt is not None or time_limit is not None or quiescence or pvs or lmr
+                         or futility or threats or tablebase is not None) #make/unmake search (search.py) instead of _max_search/_min_search
+        self.tt = tt #TranspositionTable for this player and scoring function, kept across moves
         self.current_player = current_player
         self.max_depth = max_depth #sets the alpha-beta search depth
         self.scoring_func = scoring_func
         self.board_type = board_type
         self.nodes_visited = 0
         self.pieces_left = 0
-        self.search_time = 0
+        self.search_time = 0 #seconds spent in get_best_move
         
         #the pieces values and position weights
         self.piece_value = 100
         self.center_bonus = 10
         self.advance_bonus = 5
 
-    @timing_wrapper
+        #SearchInstrumentation (instrumentation.py) collecting search counters and root times
+        self.instrumentation = instrumentation
+        if instrumentation is not None and not self.in_place:
+            instrumentation.attach(self, ('_max_search', '_min_search'), 1, evaluate='_evaluate_position')
+
+    @timed_root('search_time')
     def get_best_move(self):
         #finds the best moves using alpha-beta search
         game_state = self._init_game_state()
@@ -46,8 +74,33 @@ class ImprovedSearchAgent:
         alpha = MIN_SCORE
         beta = MAX_SCORE
         
-        #gets sorted moves for better pruning of the algorithm
-        moves = self._sort_moves(game_state.available_actions(), game_state)
+        known_move = None
+        if self.book is not None:
+            height, width = BOARD_SIZES[self.board_type]
+            known_move = self.book.action(self.board, self.current_player, height, width,
+                                          random if self.book_random else None)
+        if known_move is None and self.solver:
+            known_move = self._solver_move(game_state)
+        if known_move is not None:
+            best_move = known_move
+            moves = []
+        elif self.in_place:
+            search = new_search(self.instrumentation, game_state, self.current_player, self._evaluate_position,
+                                self._sort_bit_moves, tt=self.tt, quiescence=self.quiescence, pvs=self.pvs,
+                                aspiration=ASPIRATION_WINDOW if self.pvs else None, lmr=self.lmr,
+                                futility=self.futility, threats=self.threats, tablebase=self.tablebase)
+            if self.time_limit is None:
+                move, best_score = search.search(self.max_depth)
+                self.depth_reached = self.max_depth
+            else:
+                move, best_score, self.depth_reached = search.iterative_deepening(self.max_depth, self.time_limit)
+            self.nodes_visited += search.nodes
+            self.search_stats = search.stats()
+            best_move = game_state.to_action(move)
+            moves = []
+        else:
+            #gets sorted moves for better pruning of the algorithm
+            moves = self._sort_moves(game_state.available_actions(), game_state)
 
         for move in moves:
             self.nodes_visited += 1
@@ -69,28 +122,40 @@ class ImprovedSearchAgent:
         self._update_pieces(game_state, best_move)
         return game_state.transfer(best_move), self.nodes_visited, self.pieces_left
 
+    def _solver_move(self, state):
+        #the first move of a proven win when few pieces are left, or None
+        if state.black_num + state.white_num > self.solver_pieces:
+            return None
+        search = ProofNumberSearch(state, max_nodes=self.solver_nodes, tablebase=self.tablebase)
+        self.solver_result = search.solve()
+        self.nodes_visited += search.nodes
+        result, line = self.solver_result
+        return state.to_action(line[0]) if result == WIN and line else None
+
     def _sort_moves(self, moves, state):
         #Sorts the  moves to improve pruning chances
-        def move_value(m):
-            new_pos = single_move(m.coordinate, m.direction, m.turn) # type: ignore
-            value = 0
-            
-            #captures the moves
-            if m.turn == 1 and new_pos in state.white_positions:
-                value += self.piece_value
-            elif m.turn == 2 and new_pos in state.black_positions:
-                value += self.piece_value
-                
-            #center columns control
-            if 2 <= new_pos[1] <= 5:
-                value += self.center_bonus
-                
-            # a forward progress   
-            value += self.advance_bonus * (new_pos[0] if m.turn == 1 else 7 - new_pos[0])
-            
-            return value
+        return sorted(moves, key=lambda m: self._move_value(m.target, m.capture, m.turn), reverse=True)
 
-        return sorted(moves, key=move_value, reverse=True)
+    def _sort_bit_moves(self, state, moves):
+        #same ordering for the encoded moves of the in-place search
+        return sorted(moves, key=lambda m: self._move_value(state.target_of(m), state.is_capture(m), state.turn),
+                      reverse=True)
+
+    def _move_value(self, new_pos, captures, turn):
+        value = 0
+
+        #captures the moves
+        if captures:
+            value += self.piece_value
+
+        #center columns control
+        if 2 <= new_pos[1] <= 5:
+            value += self.center_bonus
+
+        # a forward progress
+        value += self.advance_bonus * (new_pos[0] if turn == 1 else 7 - new_pos[0])
+
+        return value
 
     def _max_search(self, state, depth, alpha, beta):
         
@@ -161,11 +226,10 @@ class ImprovedSearchAgent:
         return score
 
     def _init_game_state(self):
-        #Set up initial game state
-        if self.board_type == 0:
-            return State(boardmatrix=self.board, turn=self.current_player, function=self.scoring_func)
-        return State(boardmatrix=self.board, turn=self.current_player, function=self.scoring_func, 
-                    height=5, width=10)
+        #Set up initial game state on the bitboard
+        height, width = BOARD_SIZES[self.board_type]
+        return BitboardState.from_matrix(self.board, self.current_player, self.scoring_func,
+                                         width=width, height=height)
 
     def _update_pieces(self, state, move):
         #tracks the remaining pieces after a move
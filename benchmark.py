@@ -0,0 +1,242 @@
+#Search benchmark: the agents on a fixed corpus of positions.
+#
+# Every player (a tournament.py spec, search:heuristic:depth[:options]) makes
+# one move from each position of a seeded corpus of opening, middlegame and
+# endgame positions. Per player and position it records the nodes, the CPU
+# seconds, nodes per second, the effective branching factor (nodes ** (1 /
+# depth)) and the peak memory the move allocated. Memory is measured in a
+# second run of the move under tracemalloc, so the timings do not pay for it.
+# Each player first makes an untimed move, so imports and tables built on
+# first use are not counted; --repeat keeps the fastest of several timings.
+#
+#   python benchmark.py --json benchmark.json                 # every search at its default depths
+#   python benchmark.py --search alphabeta --depth 5 --positions 8
+#   python benchmark.py --baseline benchmark.json             # flags regressions, exits with 1
+#
+# A run compared with a baseline (an earlier --json file, on the same machine
+# and corpus) flags players whose nodes or peak memory grew, or whose nodes
+# per second fell, by more than --tolerance.
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from bitboard import BitboardState
+from tournament import PlayerSpec, SEARCHES, agent_move, initial_board, random_opening
+
+PHASES = ('opening', 'middlegame', 'endgame')
+# plies of random play from the start for the opening and middlegame positions
+OPENING_PLIES = (2, 6)
+MIDDLEGAME_PLIES = (16, 24)
+# pieces per side of the endgame positions, placed short of the row before their goal
+ENDGAME_PIECES = (3, 5)
+# the default depths per search; plain minimax (the GUI's depth 3) is full width
+DEFAULT_DEPTHS = {'minimax': (2, 3)}
+# the default heuristic per search; tree has GameState's heuristics 0-2 only
+DEFAULT_HEURISTICS = {'tree': 1}
+#relative change past which a comparison with the baseline is flagged
+TOLERANCE = 0.15
+
+
+def _playable(board, turn):
+    state = BitboardState.from_matrix(board, turn)
+    return not state.winner and state.generate_moves()
+
+
+def _random_play(rng, plies):
+    #plies random moves from the initial board, or None when the game ended first
+    state = BitboardState.from_matrix(initial_board())
+    for _ in range(plies):
+        moves = state.generate_moves()
+        if state.winner or not moves:
+            return None
+        state.make(rng.choice(moves))
+    return state.getMatrix(), state.turn
+
+
+def _random_endgame(rng):
+    #a few pieces per side, black on rows 1 to 5 and white on rows 2 to 6, so neither side wins at once
+    pieces = rng.randint(*ENDGAME_PIECES)
+    black = rng.sample(range(8, 48), pieces)
+    white = rng.sample([square for square in range(16, 56) if square not in black], pieces)
+    board = [[0] * 8 for _ in range(8)]
+    for squares, player in ((black, 1), (white, 2)):
+        for square in squares:
+            board[square // 8][square % 8] = player
+    return board, rng.choice((1, 2))
+
+
+def build_corpus(seed=0, positions=4):
+    # [{'name', 'phase', 'board', 'turn'}]: positions of each phase, the same for a seed
+    rng = random.Random(seed)
+    corpus = []
+    for phase in PHASES:
+        while sum(1 for entry in corpus if entry['phase'] == phase) < positions:
+            if phase == 'opening':
+                found = random_opening(rng.randrange(1 << 30), rng.randint(*OPENING_PLIES))
+            elif phase == 'middlegame':
+                found = _random_play(rng, rng.randint(*MIDDLEGAME_PLIES))
+            else:
+                found = _random_endgame(rng)
+            if found is None or not _playable(*found):
+                continue
+            count = sum(1 for entry in corpus if entry['phase'] == phase)
+            corpus.append({'name': '%s-%d' % (phase, count + 1), 'phase': phase, 'board': found[0],
+                           'turn': found[1]})
+    return corpus
+
+
+def spec_key(spec):
+    #the spec back as text, the key players are compared by
+    key = '%s:%d:%d' % (spec.search, spec.heuristic, spec.depth)
+    return key + (':' + spec.options if spec.options else '')
+
+
+def _move(spec, board, turn, seed):
+    #one move with the agents' prints swallowed and their random choices seeded
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, nodes, _ = agent_move(spec, board, turn)
+    return nodes
+
+
+def measure(spec, position, seed=0, memory=True, repeat=1):
+    #the benchmark record of one player's move from one corpus position, timed at best of repeat
+    seconds = None
+    for _ in range(repeat):
+        start = time.process_time()
+        nodes = _move(spec, position['board'], position['turn'], seed)
+        elapsed = time.process_time() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            _move(spec, position['board'], position['turn'], seed)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'position': position['name'], 'phase': position['phase'], 'nodes': nodes, 'seconds': seconds,
+            'nps': nodes / seconds if seconds else 0.0, 'ebf': nodes ** (1.0 / spec.depth) if nodes else 0.0,
+            'peak_memory': peak}
+
+
+def summarize(records):
+    #a player's totals over the corpus
+    nodes = sum(r['nodes'] for r in records)
+    seconds = sum(r['seconds'] for r in records)
+    peaks = [r['peak_memory'] for r in records if r['peak_memory'] is not None]
+    return {'nodes': nodes, 'seconds': seconds, 'nps': nodes / seconds if seconds else 0.0,
+            'ebf': sum(r['ebf'] for r in records) / len(records), 'peak_memory': max(peaks) if peaks else None}
+
+
+def run_benchmark(specs, corpus, seed=0, memory=True, repeat=1, progress=None):
+    # {spec key: {'label', 'summary', 'positions'}}; progress(spec key, position name) after each move
+    results = {}
+    for spec in specs:
+        #warm-up
+        _move(spec, corpus[0]['board'], corpus[0]['turn'], seed)
+        records = []
+        for position in corpus:
+            records.append(measure(spec, position, seed, memory, repeat))
+            if progress is not None:
+                progress(spec_key(spec), position['name'])
+        results[spec_key(spec)] = {'label': spec.label, 'summary': summarize(records), 'positions': records}
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    # [(spec key, message)] for every player measured worse than in baseline
+    # (a run dict as written by --json) by more than tolerance
+    regressions = []
+    for key, result in results.items():
+        old = baseline['results'].get(key)
+        if old is None:
+            continue
+        now, then = result['summary'], old['summary']
+        if now['nodes'] > then['nodes'] * (1 + tolerance):
+            regressions.append((key, "nodes %d -> %d" % (then['nodes'], now['nodes'])))
+        if now['nps'] < then['nps'] * (1 - tolerance):
+            regressions.append((key, "nodes/s %.0f -> %.0f" % (then['nps'], now['nps'])))
+        if (now['peak_memory'] is not None and then['peak_memory'] is not None
+                and now['peak_memory'] > then['peak_memory'] * (1 + tolerance)):
+            regressions.append((key, "peak memory %d -> %d bytes" % (then['peak_memory'], now['peak_memory'])))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    lines = ["%-24s %10s %9s %10s %6s %9s  %s" % ('player', 'nodes', 'seconds', 'nodes/s', 'EBF', 'peak MB',
+                                                'vs baseline')]
+    for key, result in results.items():
+        s = result['summary']
+        peak = '-' if s['peak_memory'] is None else '%.2f' % (s['peak_memory'] / 1e6)
+        change = ''
+        old = baseline['results'].get(key) if baseline else None
+        if old is not None and old['summary']['nps']:
+            change = 'nodes/s %+.1f%%' % (100.0 * (s['nps'] / old['summary']['nps'] - 1))
+        lines.append("%-24s %10d %9.2f %10.0f %6.2f %9s  %s" % (key, s['nodes'], s['seconds'], s['nps'], s['ebf'],
+                                                              peak, change))
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the agents' searches on a seeded position corpus.")
+    parser.add_argument('--player', action='append', default=[],
+                        help="player spec search:heuristic:depth[:options] (repeatable); "
+                             "replaces --search/--depth/--heuristic")
+    parser.add_argument('--search', action='append', choices=SEARCHES, help="search to run (default all)")
+    parser.add_argument('--depth', action='append', type=int,
+                        help="search depth (repeatable, default 3 and 4, minimax 2 and 3)")
+    parser.add_argument('--heuristic', type=int, help="heuristic number (default 3, tree 1)")
+    parser.add_argument('--positions', type=int, default=4, help="positions per phase (default 4)")
+    parser.add_argument('--seed', type=int, default=0, help="corpus seed (default 0)")
+    parser.add_argument('--repeat', type=int, default=1, help="time every move this often, keeping the fastest")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory runs")
+    parser.add_argument('--json', help="write the run to this file (usable as a baseline)")
+    parser.add_argument('--baseline', help="earlier --json file to compare with")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="relative change flagged as a regression (default %.2f)" % TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.player:
+        specs = [PlayerSpec.parse(text) for text in args.player]
+    else:
+        specs = [PlayerSpec(search, DEFAULT_HEURISTICS.get(search, 3) if args.heuristic is None else args.heuristic,
+                            depth) for search in args.search or SEARCHES
+                 for depth in args.depth or DEFAULT_DEPTHS.get(search, (3, 4))]
+    corpus = build_corpus(args.seed, args.positions)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline['seed'], baseline['positions']) != (args.seed, args.positions):
+            print("baseline was run on another corpus (seed %d, %d positions per phase)"
+                  % (baseline['seed'], baseline['positions']), file=sys.stderr)
+            return 2
+    results = run_benchmark(specs, corpus, args.seed, not args.no_memory, args.repeat,
+                            progress=lambda key, name: print("\r  %-24s %-14s" % (key, name), end='',
+                                                             file=sys.stderr))
+    print(file=sys.stderr)
+    print(format_results(results, baseline))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'seed': args.seed, 'positions': args.positions, 'corpus': corpus, 'results': results},
+                      f, indent=2)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for key, message in regressions:
+            print("REGRESSION %s: %s" % (key, message))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,642 @@
+import random
+
+from evaluation import piece_square_tables, STATE_HEURISTICS, GAME_STATE_HEURISTICS
+
+# Bitboard representation of the Breakthrough board.
+# Square (row, col) is bit row * width + col, one int mask per side:
+# black (1) moves down the board (+width), white (2) moves up (-width).
+
+#the two board layouts used by the agents (type/variant 0 and 1)
+BOARD_SIZES = {0: (8, 8), 1: (5, 10)}
+
+# direction numbers match calculate_move: 1 = diagonal left, 2 = forward, 3 = diagonal right
+LEFT, FORWARD, RIGHT = 1, 2, 3
+
+# the in-place search encodes a move as one int: from square << MOVE_SHIFT | to square
+MOVE_SHIFT = 6
+TO_MASK = (1 << MOVE_SHIFT) - 1
+
+# Zobrist keys: one random 64-bit number per (side, square) plus one for white to move.
+# Seeded so keys are the same in every process and run.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST = {1: [_zobrist_rng.getrandbits(64) for _ in range(64)],
+           2: [_zobrist_rng.getrandbits(64) for _ in range(64)]}
+ZOBRIST_WHITE_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+
+class BoardGeometry:
+    #precomputed masks for one board size, shared by every state of that size
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.size = height * width
+        self.full = (1 << self.size) - 1
+        self.row_masks = [((1 << width) - 1) << (r * width) for r in range(height)]
+        self.first_col = sum(1 << (r * width) for r in range(height))
+        self.last_col = self.first_col << (width - 1)
+        self.top_row = self.row_masks[0]
+        self.bottom_row = self.row_masks[height - 1]
+        # the two rows next to each side's goal: moves onto them are searched by quiescence
+        self.goal_zones = {1: self.bottom_row | self.row_masks[max(0, height - 2)],
+                           2: self.top_row | self.row_masks[min(1, height - 1)]}
+        # the two rows before each side's goal row: pieces there are one or two moves from winning
+        self.near_goal = {1: self.row_masks[max(0, height - 2)] | self.row_masks[max(0, height - 3)],
+                          2: self.row_masks[min(1, height - 1)] | self.row_masks[min(2, height - 1)]}
+        self.goal_rows = {1: self.bottom_row, 2: self.top_row}
+        self.pregoal_rows = {1: self.row_masks[max(0, height - 2)], 2: self.row_masks[min(1, height - 1)]}
+        # free-path cones: per side and square, every square ahead that an enemy piece
+        # would have to start from to catch or block a piece there before it reaches
+        # the goal (d rows ahead, at most d + 1 columns aside). An empty cone makes
+        # the piece an unstoppable runner.
+        self.free_path = {1: [], 2: []}
+        for row in range(height):
+            for col in range(width):
+                for side, rows in ((1, range(row + 1, height)), (2, range(row - 1, -1, -1))):
+                    self.free_path[side].append(sum(
+                        1 << (r * width + c) for r in rows
+                        for c in range(max(0, col - abs(r - row) - 1), min(width, col + abs(r - row) + 2))))
+        # per square: the other squares at most 2 rows and 2 columns away (PositionEvaluator's
+        # support range), so a piece's supporters are popcount(neighbourhood & own pieces)
+        self.neighbourhoods = [sum(1 << (r * width + c)
+                                   for r in range(max(0, row - 2), min(height, row + 3))
+                                   for c in range(max(0, col - 2), min(width, col + 3))) & ~(1 << (row * width + col))
+                               for row in range(height) for col in range(width)]
+
+
+_geometries = {}
+
+
+def geometry(height, width):
+    #returns the cached geometry for a board size
+    key = (height, width)
+    if key not in _geometries:
+        _geometries[key] = BoardGeometry(height, width)
+    return _geometries[key]
+
+
+def zobrist_key(black, white, turn):
+    #full Zobrist key of a position; states keep theirs updated incrementally
+    key = ZOBRIST_WHITE_TO_MOVE if turn == 2 else 0
+    for s in iter_bits(black):
+        key ^= ZOBRIST[1][s]
+    for s in iter_bits(white):
+        key ^= ZOBRIST[2][s]
+    return key
+
+
+def positions_key(black_positions, white_positions, turn, width):
+    #zobrist_key of a position given as (row, col) lists, for the list-based states
+    key = ZOBRIST_WHITE_TO_MOVE if turn == 2 else 0
+    for row, col in black_positions:
+        key ^= ZOBRIST[1][row * width + col]
+    for row, col in white_positions:
+        key ^= ZOBRIST[2][row * width + col]
+    return key
+
+
+def iter_bits(mask):
+    #yields the square index of every set bit, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitMove:
+    #a move between two squares, usable wherever Action or GameMove is expected
+    __slots__ = ('frm', 'to', 'direction', 'turn', 'capture', 'width')
+
+    def __init__(self, frm, to, direction, turn, capture, width):
+        self.frm = frm
+        self.to = to
+        self.direction = direction
+        self.turn = turn
+        self.capture = capture
+        self.width = width
+
+    @property
+    def coordinate(self):
+        return divmod(self.frm, self.width)
+
+    @property
+    def target(self):
+        return divmod(self.to, self.width)
+
+    # GameMove-style names
+    position = coordinate
+    move_dir = property(lambda self: self.direction)
+    player = property(lambda self: self.turn)
+
+    def getString(self):
+        return self.coordinate, self.direction, self.turn
+
+    get_description = getString
+
+    def getCoordinate_x(self):
+        return self.frm // self.width
+
+    get_row = getCoordinate_x
+
+
+class BitboardState:
+    # Drop-in replacement for State (engine.py): the same interface
+    # the agents use (available_actions, transfer, isgoalstate, utility,
+    # getMatrix) but move generation and transfer are a handful of shifts and
+    # masks instead of list scans.
+
+    #diagonal moves may capture an enemy piece
+    captures = True
+    # the row white's score counts from (State uses 7 on every board size) and
+    # the compiled utility() of each function number (evaluation.py)
+    white_home = 7
+    heuristics = STATE_HEURISTICS
+    # whether the coordination links are kept up to date move by move; only
+    # TreeSearchAgent's evaluation reads them, so the State-compatible searches
+    # count them on demand (coordination()) instead of paying on every move
+    track_links = False
+
+    def __init__(self, black=0, white=0, turn=1, function=0, width=8, height=8):
+        self.black = black
+        self.white = white
+        self.turn = turn
+        self.function = function
+        self.width = width
+        self.height = height
+        self.geo = geometry(height, width)
+
+        # piece counts, piece-square sums (myScore) and winner are kept up to date
+        # move by move, so the heuristics and the terminal check never rescan the board
+        self.pst = piece_square_tables(height, width, height - 1 if self.white_home is None else self.white_home)
+        if function not in self.heuristics:
+            raise ValueError("unknown heuristic %r for %s, expected one of %s"
+                             % (function, self.__class__.__name__, sorted(self.heuristics)))
+        self.heuristic = self.heuristics[function]
+        self.black_num = black.bit_count()
+        self.white_num = white.bit_count()
+        self.black_score = self.table_sum(black, 1)
+        self.white_score = self.table_sum(white, 2)
+        if self.track_links:
+            self.black_links = self.links(black)
+            self.white_links = self.links(white)
+        self.winner = self.isgoalstate()
+        self.key = zobrist_key(black, white, turn)
+        self.undo = []
+
+    @classmethod
+    def from_matrix(cls, matrix, turn=1, function=0, width=8, height=8):
+        #builds the masks from a board matrix (1 = black, 2 = white)
+        black = white = 0
+        for i in range(height):
+            for j in range(width):
+                if matrix[i][j] == 1:
+                    black |= 1 << (i * width + j)
+                elif matrix[i][j] == 2:
+                    white |= 1 << (i * width + j)
+        return cls(black, white, turn, function, width, height)
+
+    def clone(self):
+        #an independent copy with an empty undo stack, skipping __init__ on the hot path
+        state = object.__new__(self.__class__)
+        state.__dict__.update(self.__dict__)
+        state.undo = []
+        return state
+
+    # piece lists and counts for code written against State/GameState
+    @property
+    def BlackPiecePositions(self):
+        return [divmod(s, self.width) for s in iter_bits(self.black)]
+
+    @property
+    def WhitePiecePositions(self):
+        return [divmod(s, self.width) for s in iter_bits(self.white)]
+
+    onyx_pieces = black_positions = BlackPiecePositions
+    crystal_pieces = white_positions = WhitePiecePositions
+
+    onyx_count = property(lambda self: self.black_num)
+    crystal_count = property(lambda self: self.white_num)
+    player = property(lambda self: self.turn)
+
+    def move_targets(self, turn=None):
+        #the destination masks for the left, forward and right moves of one side
+        turn = self.turn if turn is None else turn
+        geo, w = self.geo, self.width
+        own = self.black if turn == 1 else self.white
+        empty = geo.full & ~(self.black | self.white)
+        diagonal = geo.full & ~own if self.captures else empty
+        if turn == 1:
+            left = ((own & ~geo.first_col) << (w - 1)) & diagonal
+            forward = (own << w) & empty
+            right = ((own & ~geo.last_col) << (w + 1)) & diagonal
+        else:
+            left = ((own & ~geo.first_col) >> (w + 1)) & diagonal
+            forward = (own >> w) & empty
+            right = ((own & ~geo.last_col) >> (w - 1)) & diagonal
+        return left, forward, right
+
+    def attacks(self, turn=None):
+        #the squares one side's pieces could capture on (diagonally ahead), occupied or not
+        turn = self.turn if turn is None else turn
+        geo, w = self.geo, self.width
+        if turn == 1:
+            return ((self.black & ~geo.first_col) << (w - 1) | (self.black & ~geo.last_col) << (w + 1)) & geo.full
+        return (self.white & ~geo.first_col) >> (w + 1) | (self.white & ~geo.last_col) >> (w - 1)
+
+    def goal_distance(self, turn):
+        #moves the side's most advanced piece needs to reach the goal, ignoring everything in its way
+        own = self.black if turn == 1 else self.white
+        rows = self.geo.row_masks
+        for distance in range(1, self.height):
+            if own & rows[self.height - 1 - distance if turn == 1 else distance]:
+                return distance
+        return self.height
+
+    def runner_distance(self, turn):
+        # moves to the goal of the side's most advanced unstoppable runner (a piece
+        # with no piece of either side in its free-path cone), or 0 if it has none
+        own, enemy = (self.black, self.white) if turn == 1 else (self.white, self.black)
+        occupied, cones, rows = own | enemy, self.geo.free_path[turn], self.geo.row_masks
+        for distance in range(1, self.height):
+            for s in iter_bits(own & rows[self.height - 1 - distance if turn == 1 else distance]):
+                if not cones[s] & occupied:
+                    return distance
+        return 0
+
+    def race_result(self):
+        # Decides races the board can settle without search, from the side to move's
+        # point of view: n > 0 means it wins within n plies, n < 0 that it loses
+        # within -n plies, 0 that nothing is decided yet.
+        turn, other, geo = self.turn, 3 - self.turn, self.geo
+        left, forward, right = self.move_targets(turn)
+        if (left | forward | right) & geo.goal_rows[turn]:
+            return 1
+        # the opponent's pieces that can step onto their goal row next move
+        left, forward, right = self.move_sources(other)
+        threats = (left | forward | right) & geo.pregoal_rows[other]
+        if threats:
+            if not self.captures or threats & (threats - 1) or threats & ~self.attacks(turn):
+                return -2
+            #the one threat can and must be captured
+            return 0
+        mine = self.runner_distance(turn)
+        if mine and mine <= self.goal_distance(other):
+            return 2 * mine - 1
+        theirs = self.runner_distance(other)
+        if theirs and theirs < self.goal_distance(turn):
+            return -2 * theirs
+        return 0
+
+    def tactical_moves(self):
+        # Captures and moves onto the two rows before the goal, for quiescence search,
+        # ordered by a cheap exchange estimate: a capture wins a piece, landing on a
+        # square the opponent attacks loses one (the capture back), and among equals
+        # the move taking the most advanced piece, then landing deepest, goes first.
+        turn = self.turn
+        enemy = self.white if turn == 1 else self.black
+        zone = self.geo.goal_zones[turn]
+        defended = self.attacks(3 - turn) if self.captures else 0
+        enemy_values, own_values = self.pst[3 - turn], self.pst[turn]
+        scored = []
+        for move in self.generate_moves():
+            to = move & TO_MASK
+            bit = 1 << to
+            if enemy & bit:
+                scored.append((0 if defended & bit else 1, enemy_values[to], own_values[to], move))
+            elif zone & bit:
+                scored.append((-1 if defended & bit else 0, 0, own_values[to], move))
+        scored.sort(reverse=True)
+        return [entry[3] for entry in scored]
+
+    def move_sources(self, turn=None):
+        #the pieces able to move left, forward and right
+        turn = self.turn if turn is None else turn
+        w = self.width
+        left, forward, right = self.move_targets(turn)
+        if turn == 1:
+            return left >> (w - 1), forward >> w, right >> (w + 1)
+        return left << (w + 1), forward << w, right << (w - 1)
+
+    def _ordered_pieces(self, mask):
+        # State order: black rows bottom-up, white rows top-down, columns left to right
+        w, row_bits = self.width, (1 << self.width) - 1
+        rows = range(self.height - 1, -1, -1) if self.turn == 1 else range(self.height)
+        for r in rows:
+            bits = (mask >> (r * w)) & row_bits
+            while bits:
+                low = bits & -bits
+                yield r * w + low.bit_length() - 1
+                bits ^= low
+
+    def generate_moves(self):
+        #all moves for the current player as encoded ints, in the same order as available_actions
+        w = self.width
+        left, forward, right = self.move_sources()
+        step = w if self.turn == 1 else -w
+        moves = []
+        append = moves.append
+        for frm in self._ordered_pieces(left | forward | right):
+            bit = 1 << frm
+            base = frm << MOVE_SHIFT
+            if left & bit:
+                append(base | (frm + step - 1))
+            if forward & bit:
+                append(base | (frm + step))
+            if right & bit:
+                append(base | (frm + step + 1))
+        return moves
+
+    def to_action(self, move):
+        #wraps an encoded move as a BitMove
+        frm, to = move >> MOVE_SHIFT, move & TO_MASK
+        step = self.width if self.turn == 1 else -self.width
+        return BitMove(frm, to, to - frm - step + 2, self.turn, self.is_capture(move), self.width)
+
+    def available_actions(self):
+        #returns all possible actions for the current player, in State's order (to_action inlined)
+        turn, w = self.turn, self.width
+        enemy = self.white if turn == 1 else self.black
+        step = w if turn == 1 else -w
+        actions = []
+        for move in self.generate_moves():
+            frm, to = move >> MOVE_SHIFT, move & TO_MASK
+            actions.append(BitMove(frm, to, to - frm - step + 2, turn, enemy >> to & 1 == 1, w))
+        return actions
+
+    def is_capture(self, move):
+        enemy = self.white if self.turn == 1 else self.black
+        return enemy >> (move & TO_MASK) & 1 == 1
+
+    def target_of(self, move):
+        #(row, col) the encoded move lands on
+        return divmod(move & TO_MASK, self.width)
+
+    def square_of(self, action):
+        #maps an Action, GameMove or BitMove to its from/to squares
+        if isinstance(action, BitMove):
+            return action.frm, action.to
+        if hasattr(action, 'getString'):
+            (row, col), direction, turn = action.getString()
+        else:
+            (row, col), direction, turn = action.get_description()
+        frm = row * self.width + col
+        step = self.width if turn == 1 else -self.width
+        return frm, frm + step + (direction - 2)
+
+    def transfer(self, action):
+        #executes an action and returns the resulting state
+        if action.__class__ is BitMove:
+            frm, to = action.frm, action.to
+        else:
+            frm, to = self.square_of(action)
+        if (self.black | self.white) >> frm & 1:
+            return self._successor(frm, to)
+        print("Invalid action!")
+        state = self.clone()
+        state.turn = 3 - self.turn
+        state.key ^= ZOBRIST_WHITE_TO_MOVE
+        return state
+
+    def make(self, move):
+        #plays an encoded move in place; unmake() takes it back
+        self.undo.append(self._apply(move >> MOVE_SHIFT, move & TO_MASK))
+
+    def unmake(self):
+        #restores the position, counters and key saved by the matching make()
+        frm, to, captured, winner, turn, key, links = self.undo.pop()
+        if links is not None:
+            self.black_links, self.white_links = links
+        bit_from, bit_to = 1 << frm, 1 << to
+        black_values, white_values = self.pst[1], self.pst[2]
+        if self.black & bit_to:
+            self.black ^= bit_from | bit_to
+            self.black_score -= black_values[to] - black_values[frm]
+            if captured:
+                self.white |= bit_to
+                self.white_num += 1
+                self.white_score += white_values[to]
+        else:
+            self.white ^= bit_from | bit_to
+            self.white_score -= white_values[to] - white_values[frm]
+            if captured:
+                self.black |= bit_to
+                self.black_num += 1
+                self.black_score += black_values[to]
+        self.winner = winner
+        self.turn = turn
+        self.key = key
+
+    def _apply(self, frm, to):
+        #moves the piece on frm to to, updating the counters; returns the undo record
+        bit_from, bit_to = 1 << frm, 1 << to
+        winner, turn, key = self.winner, self.turn, self.key
+        links = (self.black_links, self.white_links) if self.track_links else None
+        black_values, white_values = self.pst[1], self.pst[2]
+        if self.black & bit_from:
+            captured = self.white & bit_to != 0
+            self.black ^= bit_from | bit_to
+            self.black_score += black_values[to] - black_values[frm]
+            moved = ZOBRIST[1][frm] ^ ZOBRIST[1][to]
+            if captured:
+                self.white ^= bit_to
+                self.white_num -= 1
+                self.white_score -= white_values[to]
+                moved ^= ZOBRIST[2][to]
+            if not winner and (bit_to & self.geo.bottom_row or not self.white_num):
+                self.winner = 1
+            self.turn = 2
+            if links is not None:
+                self._move_links(1, frm, to, captured)
+        else:
+            captured = self.black & bit_to != 0
+            self.white ^= bit_from | bit_to
+            self.white_score += white_values[to] - white_values[frm]
+            moved = ZOBRIST[2][frm] ^ ZOBRIST[2][to]
+            if captured:
+                self.black ^= bit_to
+                self.black_num -= 1
+                self.black_score -= black_values[to]
+                moved ^= ZOBRIST[1][to]
+            if not winner and (bit_to & self.geo.top_row or not self.black_num):
+                self.winner = 2
+            self.turn = 1
+            if links is not None:
+                self._move_links(2, frm, to, captured)
+        # side to move always flips
+        self.key = key ^ moved ^ ZOBRIST_WHITE_TO_MOVE
+        return frm, to, captured, winner, turn, key, links
+
+    def _successor(self, frm, to):
+        # _apply for the copy path: a new state with the piece on frm moved to to.
+        # No undo record is built, and the new values are worked out in locals
+        # and stored once.
+        state = object.__new__(self.__class__)
+        state.__dict__.update(self.__dict__)
+        state.undo = []
+        bit_from, bit_to = 1 << frm, 1 << to
+        black, white, winner = self.black, self.white, self.winner
+        pst = self.pst
+        if black & bit_from:
+            captured = white & bit_to
+            state.black = black ^ (bit_from | bit_to)
+            values = pst[1]
+            state.black_score = self.black_score + values[to] - values[frm]
+            moved = ZOBRIST[1][frm] ^ ZOBRIST[1][to]
+            if captured:
+                state.white = white ^ bit_to
+                state.white_num = self.white_num - 1
+                state.white_score = self.white_score - pst[2][to]
+                moved ^= ZOBRIST[2][to]
+            if not winner and (bit_to & self.geo.bottom_row or not state.white_num):
+                state.winner = 1
+            state.turn = 2
+            side = 1
+        else:
+            captured = black & bit_to
+            state.white = white ^ (bit_from | bit_to)
+            values = pst[2]
+            state.white_score = self.white_score + values[to] - values[frm]
+            moved = ZOBRIST[2][frm] ^ ZOBRIST[2][to]
+            if captured:
+                state.black = black ^ bit_to
+                state.black_num = self.black_num - 1
+                state.black_score = self.black_score - pst[1][to]
+                moved ^= ZOBRIST[1][to]
+            if not winner and (bit_to & self.geo.top_row or not state.black_num):
+                state.winner = 2
+            state.turn = 1
+            side = 2
+        state.key = self.key ^ moved ^ ZOBRIST_WHITE_TO_MOVE
+        if self.track_links:
+            state._move_links(side, frm, to, captured)
+        return state
+
+    def _move_links(self, side, frm, to, captured):
+        #updates the coordination links after side's piece moved from frm to to (masks already moved)
+        near, bit_to = self.geo.neighbourhoods, 1 << to
+        own, enemy = (self.black, self.white) if side == 1 else (self.white, self.black)
+        gained = (near[to] & own).bit_count() - (near[frm] & own & ~bit_to).bit_count()
+        lost = (near[to] & enemy).bit_count() if captured else 0
+        if side == 1:
+            self.black_links += gained
+            self.white_links -= lost
+        else:
+            self.white_links += gained
+            self.black_links -= lost
+
+    def getMatrix(self):
+        #converts the current state to a matrix representation
+        matrix = [[0 for _ in range(self.width)] for _ in range(self.height)]
+        for s in iter_bits(self.black):
+            matrix[s // self.width][s % self.width] = 1
+        for s in iter_bits(self.white):
+            matrix[s // self.width][s % self.width] = 2
+        return matrix
+
+    def isgoalstate(self, type=0):
+        #the game is won by reaching the far row or by capturing every enemy piece
+        geo = self.geo
+        if type == 0:
+            if self.white & geo.top_row or not self.black:
+                return 2
+            if self.black & geo.bottom_row or not self.white:
+                return 1
+            return 0
+        # three pieces home, or a side down to two pieces
+        if self.height > 7 and (self.black & geo.row_masks[7]).bit_count() == 3:
+            return True
+        if (self.white & geo.top_row).bit_count() == 3:
+            return True
+        return self.black.bit_count() <= 2 or self.white.bit_count() <= 2
+
+    def table_sum(self, mask, side):
+        #sum of side's piece-square values over the pieces in mask
+        values = self.pst[side]
+        return sum(values[s] for s in iter_bits(mask))
+
+    def links(self, mask):
+        # number of pairs of pieces in mask within 2 rows and 2 columns of each other;
+        # equals PositionEvaluator.evaluate_piece_coordination (0.5 per ordered pair)
+        near = self.geo.neighbourhoods
+        return sum((near[s] & mask).bit_count() for s in iter_bits(mask)) // 2
+
+    def coordination(self, turn):
+        #the coordination score of one side: kept up to date when track_links is set, else counted
+        if self.track_links:
+            return self.black_links if turn == 1 else self.white_links
+        return self.links(self.black if turn == 1 else self.white)
+
+    def myScore(self, turn):
+        return self.black_score if turn == 1 else self.white_score
+
+    def opponentScore(self, turn):
+        return self.white_score if turn == 1 else self.black_score
+
+    def _score(self, function, turn):
+        #one compiled heuristic from turn's point of view
+        heuristic = self.heuristics[function]
+        if turn == 1:
+            return heuristic(self.black_score, self.white_score, self.key)
+        return heuristic(self.white_score, self.black_score, self.key)
+
+    def offensiveHeuristic1(self, turn):
+        return self._score(1, turn)
+
+    def defensiveHeuristic1(self, turn):
+        return self._score(2, turn)
+
+    def offensiveHeuristic2(self, turn):
+        return self._score(3, turn)
+
+    def defensiveHeuristic2(self, turn):
+        return self._score(4, turn)
+
+    def utility(self, turn):
+        #the state's compiled heuristic (evaluation.py), from turn's point of view
+        if turn == 1:
+            return self.heuristic(self.black_score, self.white_score, self.key)
+        return self.heuristic(self.white_score, self.black_score, self.key)
+
+
+class BitboardGameState(BitboardState):
+    # Drop-in replacement for GameState (minimax_agent.py): GameState's move
+    # order, goal check and offensive/defensive heuristics.
+
+    #GameState only moves onto empty squares
+    captures = False
+    #GameState counts white's rows from the last row of every board size
+    white_home = None
+    heuristics = GAME_STATE_HEURISTICS
+    #TreeSearchAgent's evaluation reads the links at every leaf
+    track_links = True
+
+    @property
+    def eval_func(self):
+        return self.function
+
+    def _ordered_pieces(self, mask):
+        # GameState order: rows top-down; black columns right to left, white left to right
+        w, row_bits = self.width, (1 << self.width) - 1
+        for r in range(self.height):
+            bits = (mask >> (r * w)) & row_bits
+            cols = list(iter_bits(bits))
+            if self.turn == 1:
+                cols.reverse()
+            for c in cols:
+                yield r * w + c
+
+    def isgoalstate(self):
+        geo = self.geo
+        if self.black & geo.bottom_row or not self.white:
+            return 1
+        if self.white & geo.top_row or not self.black:
+            return 2
+        return 0
+
+    myscore = BitboardState.myScore
+    enemyscore = BitboardState.opponentScore
+
+    def offensive_function(self, turn):
+        return self._score(1, turn)
+
+    def defensive_function(self, turn):
+        return self._score(2, turn)
@@ -0,0 +1,223 @@
+#Opening book built offline by deep self-play searches.
+#
+# The first moves of a game are the most expensive to search (every piece can
+# move) and always start from the same position, so they are searched once,
+# deeply, ahead of time. From the start position the builder scores every
+# move with a full-window search, keeps the best few (those within a margin of
+# the best), and expands the positions they lead to, for both sides, up to a
+# number of plies.
+#
+# The book file is a header and three arrays: the positions' Zobrist keys in
+# ascending order, and for each key entry its move (from << 6 | to, as in
+# search.py) and weight. A position's moves are consecutive, heaviest first,
+# and found by binary search on the keys.
+#
+#   python book.py --board 0 --plies 6 --depth 5
+#   python book.py --board 0 --plies 6 --depth 5 --no-captures   # GameState rules (tree)
+
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from bitboard import BitboardState, BitboardGameState, BOARD_SIZES
+from search import AlphaBetaSearch, Utility, INFINITY
+from transposition import TranspositionTable
+
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books')
+
+MAGIC = b'BTOB'
+VERSION = 1
+_HEADER = struct.Struct('<4sBBBBI')        # magic, version, height, width, captures, entries
+
+# the best move's weight; a move scoring d below it weighs BEST_WEIGHT / (1 + d)
+BEST_WEIGHT = 1000
+
+# the heuristic the searches score with by default, per rule set: Off2 with
+# captures, GameState's offensive function (heuristic 1 of 0-2) without
+DEFAULT_HEURISTIC = {True: 3, False: 1}
+
+
+def book_path(height, width, captures, directory=BOOK_DIR):
+    rules = 'captures' if captures else 'nocaptures'
+    return os.path.join(directory, 'breakthrough-%dx%d-%s.book' % (height, width, rules))
+
+
+def start_position(height, width):
+    #two rows of black at the top, two of white at the bottom
+    return [[1] * width if row < 2 else [2] * width if row >= height - 2 else [0] * width
+            for row in range(height)]
+
+
+def build(height, width, captures=True, plies=6, depth=5, breadth=3, margin=2.0, function=None, path=None,
+          progress=None):
+    # Searches the opening tree and writes the book to path (book_path() by default); returns the path.
+    # plies (int): positions up to this many plies from the start get book moves
+    # depth (int): search depth scoring each move
+    # breadth (int), margin (float): a position keeps its best breadth moves
+    #   scoring at most margin below the best one
+    # function (int): the heuristic number the searches score with, DEFAULT_HEURISTIC[captures] by
+    #   default; it must be one of the rule set's (ValueError otherwise)
+    # progress (callable): progress(positions done, seconds) after each position
+    cls = BitboardState if captures else BitboardGameState
+    if function is None:
+        function = DEFAULT_HEURISTIC[captures]
+    root = cls.from_matrix(start_position(height, width), 1, function, width, height)
+    # one table per side: the heuristics are not zero-sum, so a score stored by
+    # one side's search is no score for the other's (the GUI keeps its tables the same way)
+    tables = {1: TranspositionTable(1 << 20), 2: TranspositionTable(1 << 20)}
+    entries = {}
+    frontier = [root]
+    start = time.perf_counter()
+    for _ in range(plies):
+        following = []
+        for state in frontier:
+            if state.key in entries or state.winner:
+                continue
+            scored = _score_moves(state, depth, tables[state.turn])
+            best = scored[0][0]
+            kept = [(score, move) for score, move in scored[:breadth] if best - score <= margin]
+            entries[state.key] = [(move, max(1, round(BEST_WEIGHT / (1 + best - score)))) for score, move in kept]
+            for _, move in kept:
+                child = state.clone()
+                child.make(move)
+                child.undo = []
+                following.append(child)
+            if progress is not None:
+                progress(len(entries), time.perf_counter() - start)
+        frontier = following
+    return write(entries, height, width, captures, path)
+
+
+def _score_moves(state, depth, table):
+    #(score, move) of every move of state, best first, each searched with the full window
+    search = AlphaBetaSearch(state, state.turn, Utility(state.turn), tt=table, move_ordering=True)
+    scored = []
+    for move in state.generate_moves():
+        scored.append((search.search_move(move, depth, -INFINITY, INFINITY), move))
+    #stable on the generation order among equal scores
+    scored.sort(key=lambda entry: -entry[0])
+    return scored
+
+
+def write(entries, height, width, captures, path=None):
+    # writes {key: [(move, weight), ...]} as a book file; returns the path
+    path = path or book_path(height, width, captures)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    keys, moves, weights = array('Q'), array('H'), array('H')
+    for key in sorted(entries):
+        for move, weight in sorted(entries[key], key=lambda entry: -entry[1]):
+            keys.append(key)
+            moves.append(move)
+            weights.append(weight)
+    if sys.byteorder == 'big':
+        for values in (keys, moves, weights):
+            values.byteswap()
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, height, width, int(captures), len(keys)))
+        for values in (keys, moves, weights):
+            f.write(values.tobytes())
+    return path
+
+
+class OpeningBook:
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, self.height, self.width, captures, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a version %d opening book" % (path, VERSION))
+        self.captures = bool(captures)
+        self.keys, self.moves, self.weights = array('Q'), array('H'), array('H')
+        offset = _HEADER.size
+        for values in (self.keys, self.moves, self.weights):
+            end = offset + count * values.itemsize
+            values.frombytes(data[offset:end])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            offset = end
+
+    def __len__(self):
+        return len(self.keys)
+
+    def covers(self, state):
+        #whether the book was built for the state's board size and rules
+        return (state.height, state.width, state.captures) == (self.height, self.width, self.captures)
+
+    def entries(self, key):
+        #[(move, weight), ...] of a position's Zobrist key, heaviest first
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key, low)
+        return [(self.moves[i], self.weights[i]) for i in range(low, high)]
+
+    def choose(self, state, rng=None):
+        # An encoded book move for a bitboard state, or None when the book has no
+        # entry for it. rng (random.Random or the random module) picks among the
+        # moves by weight; without it the heaviest move is played.
+        if not self.covers(state):
+            return None
+        entries = self.entries(state.key)
+        legal = set(state.generate_moves())
+        entries = [(move, weight) for move, weight in entries if move in legal]
+        if not entries:
+            return None
+        if rng is None:
+            return entries[0][0]
+        return rng.choices([move for move, _ in entries], [weight for _, weight in entries])[0]
+
+    def action(self, matrix, turn, height, width, rng=None):
+        #the book move for a board matrix as a BitMove (accepted by every state's transfer()), or None
+        if (height, width) != (self.height, self.width):
+            return None
+        cls = BitboardState if self.captures else BitboardGameState
+        state = cls.from_matrix(matrix, turn, 0, width, height)
+        move = self.choose(state, rng)
+        return None if move is None else state.to_action(move)
+
+
+_opened = {}
+
+
+def find_book(height, width, captures, directory=BOOK_DIR):
+    #the built book for a board and rule set, loaded once per process, or None
+    path = book_path(height, width, captures, directory)
+    if path not in _opened:
+        _opened[path] = OpeningBook(path) if os.path.exists(path) else None
+    return _opened[path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a Breakthrough opening book by self-play search.")
+    parser.add_argument('--board', type=int, choices=sorted(BOARD_SIZES), default=0,
+                        help="board layout: 0 = 8x8, 1 = 5x10")
+    parser.add_argument('--plies', type=int, default=6, help="plies from the start with book moves (default 6)")
+    parser.add_argument('--depth', type=int, default=5, help="search depth per move (default 5)")
+    parser.add_argument('--breadth', type=int, default=3, help="most book moves per position (default 3)")
+    parser.add_argument('--margin', type=float, default=2.0,
+                        help="book moves score at most this much below the best (default 2)")
+    parser.add_argument('--heuristic', type=int,
+                        help="heuristic number scoring the searches (default 3, with --no-captures 1)")
+    parser.add_argument('--no-captures', action='store_true',
+                        help="GameState rules: diagonal moves onto empty squares only")
+    parser.add_argument('--output', help="file to write (default under %s)" % BOOK_DIR)
+    args = parser.parse_args(argv)
+    height, width = BOARD_SIZES[args.board]
+    heuristics = (BitboardState if not args.no_captures else BitboardGameState).heuristics
+    if args.heuristic is not None and args.heuristic not in heuristics:
+        parser.error("heuristic %d does not exist for these rules (choose from %s)"
+                     % (args.heuristic, ', '.join(map(str, sorted(heuristics)))))
+    start = time.perf_counter()
+    path = build(height, width, not args.no_captures, args.plies, args.depth, args.breadth, args.margin,
+                 args.heuristic, args.output,
+                 progress=lambda done, seconds: print("\r  %d positions, %.0fs" % (done, seconds), end=''))
+    print("\nwrote %s (%d entries) in %.1fs" % (path, len(OpeningBook(path)), time.perf_counter() - start))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,568 @@
+#The Breakthrough engine: board states, moves and the GUI's agents, without pygame.
+#
+# State, Action, MinimaxAgent and AlphaBetaAgent used to live in
+# breakthroughgame.py next to the window, so every process that searched (the
+# GUI's engines, tournament and benchmark workers, perft) imported pygame and
+# NumPy with them. This module needs neither (minimax_agent.py imports NumPy
+# only for its batch evaluation); the window is in gui.py.
+
+import random
+from bitboard import BitboardState, BOARD_SIZES, positions_key
+from evaluation import piece_square_tables, STATE_HEURISTICS, NO_HEURISTIC
+from search import AlphaBetaSearch, Utility, ASPIRATION_WINDOW, CLOCK_INTERVAL, SearchTimeout
+from instrumentation import new_search, timed_root
+from parallel import RootSplitSearch, LazySMPSearch
+from solver import ProofNumberSearch, WIN, SOLVER_PIECES, SOLVER_NODES
+
+# the initial representation of the board:
+# 1 = Dark Piece, 
+# 2 = Light Piece, 
+# 0 = Empty Cell
+gameMatrix = [[1, 1, 1, 1, 1, 1, 1, 1],
+                                [1, 1, 1, 1, 1, 1, 1, 1],
+                                [0, 0, 0, 0, 0, 0, 0, 0],
+                                [0, 0, 0, 0, 0, 0, 0, 0],
+                                [0, 0, 0, 0, 0, 0, 0, 0],
+                                [0, 0, 0, 0, 0, 0, 0, 0],
+                                [2, 2, 2, 2, 2, 2, 2, 2],
+                                [2, 2, 2, 2, 2, 2, 2, 2]]
+
+#constants for evaluation functions and boundaries, values for points
+MAX_LIMIT = float("inf")
+MIN_LIMIT = -float("inf")
+MAX_PAIR = (MAX_LIMIT, MAX_LIMIT)
+MIN_PAIR = (MIN_LIMIT, MIN_LIMIT)
+
+#calculates a single move given a position, direction, and turn based on player
+def calculate_move(start_pos, move_dir, player):
+    if player == 1:  #the black pieces move down
+        if move_dir == 1:
+            return start_pos[0] + 1, start_pos[1] - 1
+        elif move_dir == 2:
+            return start_pos[0] + 1, start_pos[1]
+        elif move_dir == 3:
+            return start_pos[0] + 1, start_pos[1] + 1
+        
+    elif player == 2:  # the white pieces move up
+        if move_dir == 1:
+            return start_pos[0] - 1, start_pos[1] - 1
+        elif move_dir == 2:
+            return start_pos[0] - 1, start_pos[1]
+        elif move_dir == 3:
+            return start_pos[0] - 1, start_pos[1] + 1
+
+# Alternates the player's turn
+def alterturn(turn):
+ #switches the turn 1 -> 2, and 2-> 1
+    return 2 if turn == 1 else 1
+
+# Represents a single action taken by a piece
+class Action:
+    def __init__(self, coordinate, direction, turn):
+        self.coordinate = coordinate #coordinate, The starting position of the piece
+        self.direction = direction #direction, the direction of the move (1, 2, or 3)
+        self.turn = turn #turn, the player's turn (1 for blac, 2 for white)
+
+    def getString(self):
+       #gets back a string representation of the move
+        return self.coordinate, self.direction, self.turn
+
+    def getCoordinate_x(self):
+    #gets x-coordinate
+        return self.coordinate[0]
+
+#represents the game state, including the board and pieces
+class State:
+    def __init__(self,
+                 BoardRepresentation=None,
+                 BlackPiecePosition=None,
+                 WhitePiecePosition=None,
+                 black_num=0,
+                 white_num=0,
+                 turn=1,
+                 function=0,
+                 width=8,
+                 height=8):
+       
+        #here it shows the game representations
+        self.width = width
+        self.height = height
+        self.BlackPiecePositions = BlackPiecePosition or []
+        self.WhitePiecePositions = WhitePiecePosition or []
+        self.black_num = black_num
+        self.white_num = white_num
+        self.turn = turn
+        self.function = function
+
+        #initializes the positions from the board if  is provided
+        if BoardRepresentation is not None:
+            for i in range(self.height):
+                for j in range(self.width):
+                    if BoardRepresentation[i][j] == 1:
+                        self.BlackPiecePositions.append((i, j))
+                        self.black_num += 1
+                    elif BoardRepresentation[i][j] == 2:
+                        self.WhitePiecePositions.append((i, j))
+                        self.white_num += 1
+
+    def transfer(self, action):
+        #executes an action and returns the resulting state.
+        black_pos = list(self.BlackPiecePositions)
+        white_pos = list(self.WhitePiecePositions)
+
+        if action.turn == 1:  # Black player's move
+            if action.coordinate in self.BlackPiecePositions:
+                index = black_pos.index(action.coordinate)
+                new_pos = calculate_move(action.coordinate, action.direction, action.turn)
+                black_pos[index] = new_pos
+                if new_pos in self.WhitePiecePositions:  #captures the opponent's piece
+                    white_pos.remove(new_pos)
+            else:
+                print("Invalid action!")
+
+        elif action.turn == 2:  # White player's move
+            if action.coordinate in self.WhitePiecePositions:
+                index = white_pos.index(action.coordinate)
+                new_pos = calculate_move(action.coordinate, action.direction, action.turn)
+                white_pos[index] = new_pos
+                if new_pos in self.BlackPiecePositions:  # capture sopponent's piece
+                    black_pos.remove(new_pos)
+            else:
+                print("Invalid action!")
+
+        # creates and return the new state
+        return State(BlackPiecePosition=black_pos, WhitePiecePosition=white_pos, 
+                     black_num=self.black_num, white_num=self.white_num,
+                     turn=alterturn(action.turn), function=self.function, 
+                     height=self.height, width=self.width)
+
+    def available_actions(self):
+        #returns all possible actions for the current player
+        available_actions = []
+
+        if self.turn == 1:  # Black player's turn
+            for pos in sorted(self.BlackPiecePositions, key=lambda p: (p[0], -p[1]), reverse=True):
+
+                #checks for possible moves such as 
+                #diagonal left, straight forward, diagonal right
+                if pos[0] != self.height - 1 and pos[1] != 0 and (pos[0] + 1, pos[1] - 1) not in self.BlackPiecePositions:
+                    available_actions.append(Action(pos, 1, 1))
+                if pos[0] != self.height - 1 and (pos[0] + 1, pos[1]) not in self.BlackPiecePositions and (pos[0] + 1, pos[1]) not in self.WhitePiecePositions:
+                    available_actions.append(Action(pos, 2, 1))
+                if pos[0] != self.height - 1 and pos[1] != self.width - 1 and (pos[0] + 1, pos[1] + 1) not in self.BlackPiecePositions:
+                    available_actions.append(Action(pos, 3, 1))
+
+        elif self.turn == 2:  # White player's turn
+            for pos in sorted(self.WhitePiecePositions, key=lambda p: (p[0], p[1])):
+
+                #checks the possible moves 
+                # diagonal left, straight forward, diagonal right
+                if pos[0] != 0 and pos[1] != 0 and (pos[0] - 1, pos[1] - 1) not in self.WhitePiecePositions:
+                    available_actions.append(Action(pos, 1, 2))
+                if pos[0] != 0 and (pos[0] - 1, pos[1]) not in self.BlackPiecePositions and (pos[0] - 1, pos[1]) not in self.WhitePiecePositions:
+                    available_actions.append(Action(pos, 2, 2))
+                if pos[0] != 0 and pos[1] != self.width - 1 and (pos[0] - 1, pos[1] + 1) not in self.WhitePiecePositions:
+                    available_actions.append(Action(pos, 3, 2))
+
+        return available_actions
+
+    def getMatrix(self):
+       #converts the current state to a matrix representation
+        matrix = [[0 for _ in range(self.width)] for _ in range(self.height)]
+        for item in self.BlackPiecePositions:
+            matrix[item[0]][item[1]] = 1
+        for item in self.WhitePiecePositions:
+            matrix[item[0]][item[1]] = 2
+        return matrix
+
+    def utility(self, turn):
+        
+        #here it computes the utility value with the compiled evaluation function (evaluation.py)
+        heuristic = STATE_HEURISTICS.get(self.function, NO_HEURISTIC)
+        return heuristic(self.myScore(turn), self.opponentScore(turn), heuristic.tiebreak and self.key())
+
+    def key(self):
+        #Zobrist key of the position, the same one BitboardState keeps
+        return positions_key(self.BlackPiecePositions, self.WhitePiecePositions, self.turn, self.width)
+
+    def winningscore(self, turn):
+        winningvalue = 200
+        if turn == 1:
+            if self.isgoalstate() == 1:
+                return winningvalue
+            elif self.isgoalstate() == 2:
+                return -winningvalue
+            else:
+                return 0
+        elif turn == 2:
+            if self.isgoalstate() == 2:
+                return winningvalue
+            elif self.isgoalstate() == 1:
+                return -winningvalue
+            else:
+                return 0
+
+    def isgoalstate(self, type=0):
+        #a stadard rule to check if the game is won by either player
+        if type == 0:
+            #if any white piece reaches the top row or black has no pieces left → White wins (returns 2)
+            if 0 in [item[0] for item in self.WhitePiecePositions] or len(self.BlackPiecePositions) == 0:
+                return 2
+            #if any black piece reaches the top row or white has no pieces left → black wins (returns 1)
+            if self.height - 1 in [item[0] for item in self.BlackPiecePositions] or len(self.WhitePiecePositions) == 0:
+                return 1
+            #game will continue of none of the above conditions are met
+            return 0
+        else:
+            count = 0 #counts how many black pieces reached the bottom row
+            for i in self.BlackPiecePositions:
+                if i[0] == 7:
+                    count += 1
+            if count == 3:
+                return True
+            count = 0 #counts the number of white pieces that reaches the bottom row
+            for i in self.WhitePiecePositions:
+                if i[0] == 0:
+                    count += 1
+            if count == 3:
+                return True
+            #so if either player has 2 or fewer peices left, the game ends
+            if len(self.BlackPiecePositions) <= 2 or len(self.WhitePiecePositions) <= 2:
+                return True
+            #no end condition is met
+        return False
+
+
+    def myScore(self, turn):
+        #pieces plus rows advanced, summed from the piece-square table
+        values = piece_square_tables(self.height, self.width, 7)[turn]
+        positions = self.BlackPiecePositions if turn == 1 else self.WhitePiecePositions
+        return sum(values[row * self.width + col] for row, col in positions)
+
+    def opponentScore(self, turn):
+        return self.myScore(alterturn(turn))
+
+    def offensiveHeuristic1(self, turn):
+        return STATE_HEURISTICS[1](self.myScore(turn), self.opponentScore(turn), self.key())
+
+    def defensiveHeuristic1(self, turn):
+        return STATE_HEURISTICS[2](self.myScore(turn), self.opponentScore(turn), self.key())
+               
+    def offensiveHeuristic2(self, turn):
+        return STATE_HEURISTICS[3](self.myScore(turn), self.opponentScore(turn))
+
+    def defensiveHeuristic2(self, turn):
+        return STATE_HEURISTICS[4](self.myScore(turn), self.opponentScore(turn))
+class MinimaxAgent:
+    
+    def __init__(self, BoardRepresentation, turn, depth, function, type=0, bitboard=False, workers=1, book=None,
+                 book_random=False, instrumentation=None, measure_parallel=False, stop=None):
+        self.BoardRepresentation = BoardRepresentation
+        self.turn = turn
+        self.maxdepth = depth
+        self.function = function
+        self.type = type
+        self.workers = workers #more than 1 splits the root moves over a process pool (parallel.py)
+        #the parallel search also runs the serial one, adding speedup and search overhead to parallel_report
+        self.measure_parallel = measure_parallel
+        #OpeningBook (book.py) played without searching while it has the position; book_random picks by weight
+        self.book = book
+        self.book_random = book_random
+        self.bitboard = bitboard or workers > 1 #searches on BitboardState instead of State
+        self.parallel_report = {}
+        #callable polled every CLOCK_INTERVAL positions; True abandons the move with SearchTimeout
+        #(the root-split search of workers > 1 is not polled)
+        self.stop = stop
+        self.blocks = 0
+        self.piece_num = 0
+        #SearchInstrumentation (instrumentation.py) collecting search counters and root times
+        self.instrumentation = instrumentation
+        if instrumentation is not None and workers == 1:
+            instrumentation.attach(self, ('max_value', 'min_value'), 1)
+
+
+    def max_value(self, state, depth):
+        if depth == self.maxdepth or state.isgoalstate() != 0:
+            return state.utility(self.turn)
+        v = MIN_LIMIT
+        for action in state.available_actions():
+            v = max(v, self.min_value(state.transfer(action), depth + 1))
+            self.blocks += 1
+            if self.stop is not None and not self.blocks % CLOCK_INTERVAL and self.stop():
+                raise SearchTimeout()
+        return v
+
+    def min_value(self, state, depth):
+        if depth == self.maxdepth or state.isgoalstate() != 0:
+            return state.utility(self.turn)
+        v = MAX_LIMIT
+        for action in state.available_actions():
+            v = min(v, self.max_value(state.transfer(action), depth + 1))
+            self.blocks += 1
+            if self.stop is not None and not self.blocks % CLOCK_INTERVAL and self.stop():
+                raise SearchTimeout()
+
+        return v
+
+    @timed_root()
+    def minimax_decision(self):
+        final_action = None
+        if self.bitboard:
+            height, width = BOARD_SIZES[self.type]
+            startingState = BitboardState.from_matrix(self.BoardRepresentation, self.turn, self.function, width, height)
+        elif self.type == 0:
+            startingState = State(BoardRepresentation=self.BoardRepresentation, turn=self.turn, function=self.function)
+        else:
+            startingState = State(BoardRepresentation=self.BoardRepresentation, turn=self.turn, function=self.function, height=3, width=10)
+        v = MIN_LIMIT
+        book_action = self._book_action()
+        if book_action is not None:
+            final_action = book_action
+        elif self.workers > 1:
+            search = RootSplitSearch(startingState, self.turn, Utility(self.turn), workers=self.workers, prune=False)
+            move, v = search.search(self.maxdepth, measure=self.measure_parallel)
+            self.blocks += search.nodes
+            self.parallel_report = search.report
+            final_action = startingState.to_action(move)
+        else:
+            for action in startingState.available_actions():
+                self.blocks += 1
+                newState = startingState.transfer(action)
+                if newState.isgoalstate():
+                    final_action = action
+                    break
+                minresult = self.min_value(newState, 1)
+                if minresult > v:
+                    final_action = action
+                    v = minresult
+        if self.turn == 1:
+            self.piece_num = startingState.transfer(final_action).white_num
+        elif self.turn == 2:
+            self.piece_num = startingState.transfer(final_action).black_num
+        print(final_action.getString())
+        return startingState.transfer(final_action), self.blocks, self.piece_num
+
+    def _book_action(self):
+        #the opening book's move for this position, or None
+        if self.book is None:
+            return None
+        height, width = BOARD_SIZES[self.type]
+        return self.book.action(self.BoardRepresentation, self.turn, height, width,
+                                random if self.book_random else None)
+
+
+class AlphaBetaAgent: 
+    def __init__(self, BoardRepresentation, turn, depth, function, type=0, bitboard=False, in_place=False, tt=None,
+                 time_limit=None, workers=1, helpers=0, move_ordering=True, quiescence=False, pvs=False,
+                 lmr=False, futility=False, threats=False, tablebase=None, book=None, book_random=False,
+                 solver=False, solver_pieces=SOLVER_PIECES, solver_nodes=SOLVER_NODES, stop=None, ponder=None,
+                 instrumentation=None, measure_parallel=False):
+        self.BoardRepresentation = BoardRepresentation
+        self.turn = turn
+        self.maxdepth = depth
+        self.function = function
+        self.type = type
+        #seconds per move; iterative deepening up to depth instead of one fixed-depth search
+        self.time_limit = time_limit
+        self.depth_reached = 0
+        #more than 1 splits the root moves over a process pool (parallel.py), at fixed depth
+        self.workers = workers
+        self.parallel_report = {}
+        #the parallel search also runs the serial one, adding speedup and search overhead to parallel_report
+        self.measure_parallel = measure_parallel
+        if workers > 1 and (time_limit is not None or tt is not None):
+            raise ValueError("the parallel search runs at fixed depth without a transposition table")
+        #Lazy SMP helper processes sharing tt, which must then be a SharedTranspositionTable
+        self.helpers = helpers
+        self.smp_report = {}
+        #captures and moves onto the last two rows are searched past depth until the position is quiet
+        self.quiescence = quiescence
+        #principal variation search, with aspiration windows when deepening iteratively
+        self.pvs = pvs
+        #late-move reductions and futility pruning of quiet moves
+        self.lmr = lmr
+        self.futility = futility
+        #runner and goal-threat detection: decided races score near a win, threats extend the search
+        self.threats = threats
+        #endgame Tablebase (tablebase.py) probed by the search for positions with few pieces
+        self.tablebase = tablebase
+        #OpeningBook (book.py) played without searching while it has the position; book_random picks by weight
+        self.book = book
+        self.book_random = book_random
+        #with at most solver_pieces pieces left, the proof-number solver (solver.py) runs first for up to
+        #solver_nodes nodes and a proven win is played without searching; solver_result keeps (result, line)
+        self.solver = solver
+        self.solver_pieces = solver_pieces
+        self.solver_nodes = solver_nodes
+        self.solver_result = None
+        #callable the in-place search polls, True abandoning it (AlphaBetaSearch.stop)
+        self.stop = stop
+        #result of an earlier ponder(): when this is the position it searched, its move, score
+        #and depth are used as they are or deepened further (ponder_hit tells)
+        self.ponder_result = ponder
+        self.ponder_hit = False
+        self.in_place = (in_place or tt is not None or time_limit is not None or workers > 1 or quiescence
+                         or pvs or lmr or futility or threats or tablebase is not None) #make/unmake search (search.py) instead of max_value/min_value
+        self.bitboard = bitboard or self.in_place #searches on BitboardState instead of State
+        self.tt = tt #TranspositionTable for this player and function, kept across moves
+        #killer moves and history heuristic in the in-place search; search_stats gets its counters
+        self.move_ordering = move_ordering
+        self.search_stats = {}
+        self.blocks = 0
+        self.piece_num = 0
+        #SearchInstrumentation (instrumentation.py) collecting search counters and root times
+        self.instrumentation = instrumentation
+        if instrumentation is not None and not self.in_place:
+            instrumentation.attach(self, ('max_value', 'min_value'), 3)
+
+    def max_value(self, state, alpha, beta, depth):
+        if depth == self.maxdepth or state.isgoalstate() != 0:
+            return state.utility(self.turn)
+        v = MIN_LIMIT
+        actions = state.available_actions()
+ 
+        for action in actions:
+            self.blocks += 1
+
+            v = max(v, self.min_value(state.transfer(action), alpha, beta, depth + 1))
+            if v >= beta:
+                return v
+            alpha = max(alpha, v)
+        return v
+
+    def min_value(self, state, alpha, beta, depth):
+        if depth == self.maxdepth or state.isgoalstate() != 0:
+            return state.utility(self.turn)
+        v = MAX_LIMIT
+        actions = state.available_actions()
+
+        for action in actions:
+            self.blocks += 1
+
+            v = min(v, self.max_value(state.transfer(action), alpha, beta, depth + 1))
+            if v <= alpha:
+                return v
+            beta = min(beta, v)
+        return v
+
+    _book_action = MinimaxAgent._book_action
+
+    def _solver_action(self):
+        #the first move of a proven win when few pieces are left, or None
+        if not self.solver:
+            return None
+        height, width = BOARD_SIZES[self.type]
+        state = BitboardState.from_matrix(self.BoardRepresentation, self.turn, self.function, width, height)
+        if state.black_num + state.white_num > self.solver_pieces:
+            return None
+        search = ProofNumberSearch(state, max_nodes=self.solver_nodes, tablebase=self.tablebase)
+        self.solver_result = search.solve()
+        self.blocks += search.nodes
+        result, line = self.solver_result
+        return state.to_action(line[0]) if result == WIN and line else None
+
+    def predicted_position(self, board):
+        # The board after the opponent's reply this agent's table expects, board being
+        # the position after this agent's move; None when the table has no reply for it
+        if self.tt is None:
+            return None
+        height, width = BOARD_SIZES[self.type]
+        state = BitboardState.from_matrix(board, 3 - self.turn, self.function, width, height)
+        entry = self.tt.probe(state.key)
+        if state.winner or entry is None or entry[3] not in state.generate_moves():
+            return None
+        state.make(entry[3])
+        return state.getMatrix()
+
+    def ponder(self, board, stop, time_limit=None):
+        # Searches board (this agent to move) while the opponent thinks, deepening
+        # until stop() returns True, time_limit seconds have passed or maxdepth is done,
+        # with this agent's table and options. Returns the result to pass as ponder=
+        # for the next move.
+        height, width = BOARD_SIZES[self.type]
+        state = BitboardState.from_matrix(board, self.turn, self.function, width, height)
+        search = AlphaBetaSearch(state, self.turn, Utility(self.turn), tt=self.tt, **self._search_options())
+        search.stop = stop
+        move, score, depth = search.iterative_deepening(self.maxdepth, time_limit)
+        return {'key': state.key, 'function': self.function, 'move': move, 'score': score, 'depth': depth,
+                'nodes': search.nodes}
+
+    def _pondered(self, state):
+        #(move, score, depth) pondering found for state, or None
+        result = self.ponder_result
+        if (result is None or result['move'] is None or result['key'] != state.key
+                or result['function'] != self.function):
+            return None
+        self.ponder_hit = True
+        return result['move'], result['score'], result['depth']
+
+    def _search_options(self):
+        #the AlphaBetaSearch keywords for this agent's switches
+        return {'move_ordering': self.move_ordering, 'quiescence': self.quiescence, 'pvs': self.pvs,
+                'aspiration': ASPIRATION_WINDOW if self.pvs else None, 'lmr': self.lmr, 'futility': self.futility,
+                'threats': self.threats, 'tablebase': self.tablebase}
+
+    @timed_root()
+    def alpha_beta_decision(self):
+        final_action = None
+        if self.bitboard:
+            height, width = BOARD_SIZES[self.type]
+            startingState = BitboardState.from_matrix(self.BoardRepresentation, self.turn, self.function, width, height)
+        elif self.type == 0:
+            startingState = State(BoardRepresentation=self.BoardRepresentation, turn=self.turn, function=self.function)
+        else:
+            startingState = State(BoardRepresentation=self.BoardRepresentation, turn=self.turn, function=self.function, height=4, width=10)
+        v = MIN_LIMIT
+        known_action = self._book_action() or self._solver_action()
+        if known_action is not None:
+            final_action = known_action
+        elif self.workers > 1:
+            search = RootSplitSearch(startingState, self.turn, Utility(self.turn), workers=self.workers,
+                                     **self._search_options())
+            move, v = search.search(self.maxdepth, measure=self.measure_parallel)
+            self.depth_reached = self.maxdepth
+            self.blocks += search.nodes
+            self.parallel_report = search.report
+            final_action = startingState.to_action(move)
+        elif self.helpers:
+            search = LazySMPSearch(startingState, self.turn, Utility(self.turn), self.tt, helpers=self.helpers,
+                                   **self._search_options())
+            move, v, self.depth_reached = search.iterative_deepening(self.maxdepth, self.time_limit)
+            self.blocks += search.nodes
+            self.smp_report = search.report
+            final_action = startingState.to_action(move)
+        elif self.in_place:
+            search = new_search(self.instrumentation, startingState, self.turn, Utility(self.turn), tt=self.tt,
+                                **self._search_options())
+            search.stop = self.stop
+            known = self._pondered(startingState)
+            if known is not None and known[2] >= self.maxdepth:
+                #pondering already searched the position to full depth
+                move, v, self.depth_reached = known
+            elif self.time_limit is None:
+                move, v = search.search(self.maxdepth)
+                self.depth_reached = self.maxdepth
+            else:
+                move, v, self.depth_reached = search.iterative_deepening(self.maxdepth, self.time_limit, known=known)
+            self.blocks += search.nodes
+            self.search_stats = search.stats()
+            final_action = startingState.to_action(move)
+        else:
+            for action in startingState.available_actions():
+                self.blocks += 1
+
+                newState = startingState.transfer(action)
+                if newState.isgoalstate():
+                    final_action = action
+                    break
+                minresult = self.min_value(newState, MIN_LIMIT, MAX_LIMIT, 1)
+                if minresult > v:
+                    final_action = action
+                    v = minresult
+        print(v)
+        if self.turn == 1:
+            self.piece_num = startingState.transfer(final_action).white_num
+        elif self.turn == 2:
+            self.piece_num = startingState.transfer(final_action).black_num
+        print(final_action.getString())
+        return startingState.transfer(final_action), self.blocks, self.piece_num
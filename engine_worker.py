@@ -0,0 +1,158 @@
+#Background engine for the GUI.
+#
+# StrategicGame used to call the agents inside its frame loop, so the window
+# froze (no events, no redraw) for as long as a move took. The agents now run
+# in an engine process: the GUI sends it a position, keeps drawing and
+# handling events, and polls for the move once per frame. Being a separate
+# process, the search neither holds the GUI's interpreter lock nor shares its
+# core. The process keeps the alpha-beta players' transposition tables across
+# moves, as the GUI did.
+#
+# Each request carries an id, and the GUI only accepts the answer to the one
+# it is waiting for, so a cancelled move's late answer is dropped. Cancelling
+# also sets an event the searches poll (the minimax player's as well as the
+# alpha-beta players'), which abandons the move within CLOCK_INTERVAL nodes
+# instead of letting it run to the end.
+#
+# An engine made with ponder=True goes on thinking after an alpha-beta answer:
+# it takes the reply its table predicts and searches the position after it,
+# with the same table, until the next request arrives. When the game reaches
+# that position the pondered result is deepened from where it stopped (or
+# played at once if it is already at full depth); on any other move it is
+# dropped. The GUI gives each player an engine, so one ponders while the
+# other searches. Pondering gives up after PONDER_TIME_FACTOR times the move
+# time, and stop_pondering() ends it at once when no request will follow (the
+# game is over).
+
+import multiprocessing
+import time
+
+#seconds close() waits for the engine to exit before terminating it
+CLOSE_TIMEOUT = 2.0
+
+#pondering stops after this many times the move time, even if no request arrives
+PONDER_TIME_FACTOR = 4
+
+
+class MoveCancelled(Exception):
+    #raised inside the engine's search when the GUI has cancelled the move
+    pass
+
+
+def _engine_loop(connection, cancelled, move_time, max_depth, ponder=False):
+    # The engine process: answers ('move', id, search type, heuristic, board,
+    # player) with (id, (board, nodes, pieces, seconds)), clears its tables on
+    # ('reset',), exits on None. Pondering stops as soon as any message is waiting
+    # (('stop',) only does that) or after PONDER_TIME_FACTOR * move_time seconds.
+    from engine import MinimaxAgent, AlphaBetaAgent
+    from transposition import TranspositionTable
+    from book import find_book
+
+    def stop():
+        if cancelled.is_set():
+            raise MoveCancelled()
+        return False
+
+    def request_waiting():
+        return connection.poll() or cancelled.is_set()
+
+    tables = {}
+    pondered = {} #player -> result of the last ponder for them
+    book = find_book(8, 8, captures=True)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        if request[0] == 'reset':
+            tables.clear()
+            pondered.clear()
+            continue
+        if request[0] == 'stop':
+            continue
+        _, request_id, searchtype, heuristic, board, player = request
+        cancelled.clear()
+        start = time.process_time()
+        try:
+            if searchtype == 1:
+                agent = MinimaxAgent(board, player, 3, heuristic, bitboard=True, book=book, book_random=True,
+                                     stop=stop)
+                state, nodes, pieces = agent.minimax_decision()
+            else:
+                table = tables.setdefault((player, heuristic), TranspositionTable())
+                agent = AlphaBetaAgent(board, player, max_depth, heuristic, tt=table, time_limit=move_time,
+                                       book=book, book_random=True, stop=stop, ponder=pondered.pop(player, None))
+                state, nodes, pieces = agent.alpha_beta_decision()
+        except MoveCancelled:
+            continue
+        connection.send((request_id, (state.getMatrix(), nodes, pieces, time.process_time() - start)))
+        if ponder and searchtype == 2:
+            position = agent.predicted_position(state.getMatrix())
+            if position is not None:
+                pondered[player] = agent.ponder(position, request_waiting, PONDER_TIME_FACTOR * move_time)
+    connection.close()
+
+
+class EngineWorker:
+    # The GUI's handle on the engine process. start() sends a move request,
+    # poll() returns its answer once it has arrived, cancel() drops it.
+
+    def __init__(self, move_time, max_depth, ponder=False):
+        # move_time (float), max_depth (int): the alpha-beta players' time per move and depth cap
+        # ponder (bool): search the predicted reply between requests
+        #spawned rather than forked, so the engine does not inherit the GUI's SDL state
+        context = multiprocessing.get_context('spawn')
+        self.connection, child = context.Pipe()
+        self.cancelled = context.Event()
+        self.process = context.Process(target=_engine_loop,
+                                       args=(child, self.cancelled, move_time, max_depth, ponder), daemon=True)
+        self.process.start()
+        child.close()
+        self.pending = None #id of the request whose answer is awaited
+        self.requests = 0
+
+    @property
+    def busy(self):
+        return self.pending is not None
+
+    def start(self, searchtype, heuristic, board, player):
+        # asks for a move: searchtype 1 = minimax, 2 = alpha-beta, heuristic its function number
+        self.requests += 1
+        self.pending = self.requests
+        self.connection.send(('move', self.pending, searchtype, heuristic, board, player))
+
+    def poll(self):
+        # (board, nodes, pieces, seconds) of the pending move once it is ready,
+        # else None; never blocks
+        while self.pending is not None and self.connection.poll():
+            request_id, result = self.connection.recv()
+            if request_id == self.pending:
+                self.pending = None
+                return result
+        return None
+
+    def cancel(self, reset=False):
+        #drops the pending move, stopping its search; reset also clears the engine's tables
+        if self.pending is not None:
+            self.cancelled.set()
+            self.pending = None
+        if reset:
+            self.connection.send(('reset',))
+
+    def stop_pondering(self):
+        #ends the engine's pondering now, e.g. when the game is over and no request will follow
+        self.connection.send(('stop',))
+
+    def close(self):
+        #stops the engine process, terminating it if it does not exit in time
+        if not self.process.is_alive():
+            return
+        self.cancel()
+        try:
+            self.connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(CLOSE_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
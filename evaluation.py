@@ -0,0 +1,65 @@
+#Compiled heuristics.
+#
+# Every heuristic of State (Off1, Def1, Off2, Def2) and of GameState (offensive,
+# defensive) is a weighted sum of the two sides' scores plus a constant, a side's
+# score being its pieces plus the rows they have advanced. That score is a sum
+# of per-square values (a piece-square table), so a state can keep both sides'
+# sums up to date move by move and a heuristic costs one multiply-add.
+#
+# Off1 and Def1 used to add random.random() / 10 to break ties between equal
+# scores. The tie-break is now a hash of the position's Zobrist key: still in
+# [0, 0.1), but the same position always gets the same score.
+
+_tables = {}
+
+
+def piece_square_tables(height, width, white_home):
+    # {1: black table, 2: white table}, each indexed by square (row * width + col):
+    # 1 + rows advanced, black counting from row 0 and white from row white_home
+    # (State uses 7 on every board, GameState the last row)
+    key = (height, width, white_home)
+    if key not in _tables:
+        rows = [row for row in range(height) for _ in range(width)]
+        _tables[key] = {1: [1 + row for row in rows], 2: [1 + white_home - row for row in rows]}
+    return _tables[key]
+
+
+def tie_break(key):
+    #a value in [0, 0.1) fixed by the position's Zobrist key
+    return (((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 40) / (1 << 24) / 10
+
+
+class Heuristic:
+    #own * my score + enemy * opponent's score + constant (+ tie-break)
+    __slots__ = ('own', 'enemy', 'constant', 'tiebreak')
+
+    def __init__(self, own, enemy, constant=0, tiebreak=False):
+        self.own = own
+        self.enemy = enemy
+        self.constant = constant
+        self.tiebreak = tiebreak
+
+    def __call__(self, mine, theirs, key=0):
+        score = self.own * mine + self.enemy * theirs + self.constant
+        if self.tiebreak:
+            score += tie_break(key)
+        return score
+
+
+NO_HEURISTIC = Heuristic(0, 0)
+
+# State / BitboardState: utility(function) for function 0-4
+STATE_HEURISTICS = {
+    0: NO_HEURISTIC,
+    1: Heuristic(0, -2, 60, tiebreak=True),    # offensiveHeuristic1: 2 * (30 - opponent) + tie-break
+    2: Heuristic(2, 0, tiebreak=True),         # defensiveHeuristic1: 2 * mine + tie-break
+    3: Heuristic(1, -2),                       # offensiveHeuristic2
+    4: Heuristic(2, -2),                       # defensiveHeuristic2
+}
+
+# GameState / BitboardGameState: utility(eval_func) for eval_func 0-2
+GAME_STATE_HEURISTICS = {
+    0: NO_HEURISTIC,
+    1: Heuristic(2, -1),                       # offensive_function
+    2: Heuristic(1, -2),                       # defensive_function
+}
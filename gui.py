@@ -0,0 +1,305 @@
+#The Pygame window: the board, the match buttons and the match loop.
+#
+# The players search in engine_worker.py processes; this module only draws and
+# handles events. breakthroughgame.py starts it.
+
+import pygame
+import sys, os
+from engine_worker import EngineWorker
+from renderer import BoardRenderer
+
+#the GUI's alpha-beta players deepen iteratively for MOVE_TIME seconds, up to MAX_SEARCH_DEPTH plies
+MOVE_TIME = 1.0
+MAX_SEARCH_DEPTH = 12
+
+#while an engine is thinking the GUI wakes this often (ms) to look for its move; otherwise it sleeps until an event
+ENGINE_POLL_MS = 20
+#the game phases of the six matchups
+MATCH_PHASES = (5, 6, 7, 8, 9, 10)
+
+class StrategicGame:
+
+    def __init__(self):
+        #Initialize all game variables and setup
+        
+        pygame.init()
+        
+        self.window_width, self.window_height = 1000, 750  # Increased from 800x600
+        self.grid_size = int(700/8)  # Increased board size from 560 to 700
+        self.window = pygame.display.set_mode((self.window_width, self.window_height))
+        self.window.fill([255, 255, 255])
+        self.game_board = 0
+        self.black_piece = 0
+        self.white_piece = 0
+        self.reset_button = 0
+        self.victory_icon = 0
+        self.game_state = [[1, 1, 1, 1, 1, 1, 1, 1],
+                             [1, 1, 1, 1, 1, 1, 1, 1],
+                             [0, 0, 0, 0, 0, 0, 0, 0],
+                             [0, 0, 0, 0, 0, 0, 0, 0],
+                             [0, 0, 0, 0, 0, 0, 0, 0],
+                             [0, 0, 0, 0, 0, 0, 0, 0],
+                             [2, 2, 2, 2, 2, 2, 2, 2],
+                             [2, 2, 2, 2, 2, 2, 2, 2]]
+
+        self.game_phase = 0
+        self.current_player = 1
+        self.start_x = 0
+        self.start_y = 0
+        self.end_x = 0
+        self.end_y = 0
+
+        self.player1_explored = 0
+        self.player2_explored = 0
+        self.player1_duration = 0
+        self.player2_duration = 0
+        self.player1_turns = 0
+        self.player2_turns = 0
+        self.captured_count = 0
+        #the AI players search in background processes (engine_worker.py) so the window stays responsive;
+        #one engine per player, each pondering its next move while the other one searches
+        self.engines = {player: EngineWorker(MOVE_TIME, MAX_SEARCH_DEPTH, ponder=True) for player in (1, 2)}
+
+        pygame.display.set_caption("The Breakthrough Game")
+
+        self.load_resources()
+        self.renderer = BoardRenderer(self.window, self.game_board, {1: self.black_piece, 2: self.white_piece},
+                                      self.victory_icon, self.grid_size)
+
+    def load_resources(self):
+        #loads and runs the games assets such as images
+        self.game_board = pygame.image.load_extended(os.path.join('images', 'chessboard.jpg'))
+        self.game_board = pygame.transform.scale(self.game_board, (700, 700))  # Increased from 560x560
+        self.black_piece = pygame.image.load_extended(os.path.join('images', 'blackchess.png'))
+        self.black_piece = pygame.transform.scale(self.black_piece, (self.grid_size- 20, self.grid_size - 20))
+        self.white_piece = pygame.image.load_extended(os.path.join('images', 'whitechess.png'))
+        self.white_piece = pygame.transform.scale(self.white_piece, (self.grid_size - 20, self.grid_size - 20))
+        self.reset_button = pygame.image.load_extended(os.path.join('images', 'reset.jpg'))
+        self.reset_button = pygame.transform.scale(self.reset_button, (80, 80))
+        self.victory_icon = pygame.image.load_extended(os.path.join('images', 'winner.png'))
+        self.victory_icon = pygame.transform.scale(self.victory_icon, (250, 250))
+
+    def run(self):
+        #runs the game: one step of the match, a redraw of what changed, then the events
+        if self.game_phase in MATCH_PHASES:
+            if self.game_phase == 5:  # Minimax (Off1) vs Alpha-beta (Off1)
+                if self.current_player == 1:
+                    player1search = 1  # Minimax
+                    player1heur = 1    # Offensive 1
+                else:
+                    player2search = 2  # Alpha-beta
+                    player2heur = 1    # Offensive 1
+
+            elif self.game_phase == 6:  # Alpha-beta (Off2) vs Alpha-beta (Def1)
+                player1search = 2  # Alpha-beta
+                player2search = 2  # Alpha-beta
+                if self.current_player == 1:
+                    player1heur = 3    # Offensive 2
+                else:
+                    player2heur = 2    # Defensive 1
+
+            elif self.game_phase == 7:  # Alpha-beta (Def2) vs Alpha-beta (Off1)
+                player1search = 2  # Alpha-beta
+                player2search = 2  # Alpha-beta
+                if self.current_player == 1:
+                    player1heur = 4    # Defensive 2
+                else:
+                    player2heur = 1    # Offensive 1
+
+            elif self.game_phase == 8:  # Alpha-beta (Off2) vs Alpha-beta (Off1)
+                player1search = 2  # Alpha-beta
+                player2search = 2  # Alpha-beta
+                if self.current_player == 1:
+                    player1heur = 3    # Offensive 2
+                else:
+                    player2heur = 1    # Offensive 1
+
+            elif self.game_phase == 9:  # Alpha-beta (Def2) vs Alpha-beta (Def1)
+                player1search = 2  # Alpha-beta
+                player2search = 2  # Alpha-beta
+                if self.current_player == 1:
+                    player1heur = 4    # Defensive 2
+                else:
+                    player2heur = 2    # Defensive 1
+
+            elif self.game_phase == 10:  # Alpha-beta (Off2) vs Alpha-beta (Def2)
+                player1search = 2  # Alpha-beta
+                player2search = 2  # Alpha-beta
+                if self.current_player == 1:
+                    player1heur = 3    # Offensive 2
+                else:
+                    player2heur = 4    # Defensive 2
+
+            mover = self.current_player
+            if mover == 1:
+                seconds = self.ai_move(player1search, player1heur)
+            else:
+                seconds = self.ai_move(player2search, player2heur)
+            if seconds is None:
+                pass #the engine is still thinking
+            elif mover == 1:
+                self.player1_duration += seconds
+                self.player1_turns += 1
+                print('Total number of steps by Player 1  = ', self.player1_turns,
+                      'Total number of steps covered by Player 1  = ', self.player1_explored, "\n",
+                      'Average blocks covered per move by Player 1 = ', self.player1_explored / self.player1_turns,
+                      'Average time taken per step by Player 1  = ', self.player1_duration / self.player1_turns, "\n",
+                      'Player 1 has captured = ', self.captured_count)
+            else:
+                self.player2_duration += seconds
+                self.player2_turns += 1
+                print('Total number of steps by Player 2 = ', self.player2_turns,
+                      'Total number of steps covered by Player 2 = ', self.player2_explored, "\n",
+                      'Average blocks covered per move by Player 2 = ', self.player2_explored / self.player2_turns,
+                      'Average time taken per step by Player 2 = ', self.player2_duration / self.player2_turns, "\n",
+                      'Player 2 has captured ', self.captured_count)
+
+        dirty = self.display()
+        if dirty:
+            pygame.display.update(dirty)
+
+        for event in self.next_events():
+            if event.type == pygame.QUIT:
+                self.quit()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:  #esc to quit
+                    self.quit()
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.isreset(event.pos):
+                #abandons the engines' move in progress, their pondering and their tables
+                for engine in self.engines.values():
+                    engine.cancel(reset=True)
+                self.game_state = [[1, 1, 1, 1, 1, 1, 1, 1],
+                                  [1, 1, 1, 1, 1, 1, 1, 1],
+                                  [0, 0, 0, 0, 0, 0, 0, 0],
+                                  [0, 0, 0, 0, 0, 0, 0, 0],
+                                  [0, 0, 0, 0, 0, 0, 0, 0],
+                                  [0, 0, 0, 0, 0, 0, 0, 0],
+                                  [2, 2, 2, 2, 2, 2, 2, 2],
+                                  [2, 2, 2, 2, 2, 2, 2, 2]]
+                self.current_player = 1
+                self.game_phase = 0
+                self.player1_explored = 0
+                self.player2_explored = 0
+                self.player1_duration = 0
+                self.player2_duration = 0
+                self.player1_turns = 0
+                self.player2_turns = 0
+                self.captured_count = 0
+
+            #checks which matchup button was clicked
+            # then sets the corresponding game phase
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.ismatchup(1, event.pos):
+                self.game_phase = 5 #match 1
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.ismatchup(2, event.pos):
+                self.game_phase = 6 #match 2
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.ismatchup(3, event.pos):
+                self.game_phase = 7 #match 3
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.ismatchup(4, event.pos):
+                self.game_phase = 8 #match 4
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.ismatchup(5, event.pos):
+                self.game_phase = 9 #match 5
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.ismatchup(6, event.pos):
+                self.game_phase = 10 # match 6
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.renderer.invalidate()
+
+    def next_events(self):
+        # The events to handle. During a match this waits at most ENGINE_POLL_MS
+        # for one, so the engine's move is picked up soon after it arrives; with
+        # no match running the window sleeps until something happens.
+        if self.game_phase in MATCH_PHASES:
+            event = pygame.event.wait(ENGINE_POLL_MS)
+        else:
+            event = pygame.event.wait()
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    #Graphical User Interface part starst here
+    #as clear and clean as it can be 
+
+    def display(self): #displays the game board
+        #draws what changed since the last frame (renderer.py) and returns the rectangles to update
+        winner = None
+        if self.game_phase == 3:
+            winner = "%s Win!" % ("White Pieces" if self.current_player == 1 else "Black Pieces")
+        return self.renderer.draw(self.game_state, self.current_player,
+                                  self.player1_duration + self.player2_duration, winner)
+
+    def isreset(self, pos):
+        #checks when reset or if reset button was clicked
+        x, y = pos
+        return 735 <= x <= 965 and 15 <= y <= 55
+
+    def ismatchup(self, matchup, pos):
+        #checks when matchup or if match button was clicked
+        x, y = pos
+        button_y = 180 + ((matchup - 1) * 85)
+        return 735 <= x <= 965 and button_y <= y <= button_y + 80
+
+    def ai_move(self, searchtype, evaluation):
+        # Asks the engine for the current player's move (searchtype 1 = minimax,
+        # 2 = alpha-beta) and plays it once it has arrived, returning the seconds
+        # the engine took; None while it is still thinking.
+        engine = self.engines[self.current_player]
+        if not engine.busy:
+            engine.start(searchtype, evaluation, self.game_state, self.current_player)
+        result = engine.poll()
+        if result is None:
+            return None
+        board, blocks, piece, seconds = result
+        self.game_state = board
+        if self.current_player == 1:
+            self.player1_explored += blocks
+            self.current_player = 2
+        elif self.current_player == 2:
+            self.player2_explored += blocks
+            self.current_player = 1
+        self.captured_count = 16 - piece
+        if self.isgoalstate():
+            self.game_phase = 3
+            #no move will be asked for again until the next match: the engines stop pondering
+            for engine in self.engines.values():
+                engine.stop_pondering()
+        return seconds
+
+    def quit(self):
+        #stops the engines, then closes the window and exits
+        for engine in self.engines.values():
+            engine.close()
+        pygame.quit()
+        sys.exit()
+
+    def isgoalstate(self, base=0):
+        if base == 0:
+            if 2 in self.game_state[0] or 1 in self.game_state[7]:
+                return True
+            else:
+                for line in self.game_state:
+                    if 1 in line or 2 in line:
+                        return False
+            return True
+        else:
+            count = 0
+            for i in self.game_state[0]:
+                if i == 2:
+                    count += 1
+            if count == 3:
+                return True
+            count = 0
+            for i in self.game_state[7]:
+                if i == 1:
+                    count += 1
+            if count == 3:
+                return True
+            count1 = 0
+            count2 = 0
+            for line in self.game_state:
+                for i in line:
+                    if i == 1:
+                        count1 += 1
+                    elif i == 2:
+                        count2 += 1
+            if count1 <= 2 or count2 <= 2:
+                return True
+        return False
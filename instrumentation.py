@@ -0,0 +1,206 @@
+#Search instrumentation the agents can attach.
+#
+# The agents used to time themselves with decorators: track_analysis_time
+# wrapped every recursive call, so nested frames paid for two clock reads each
+# and their times were added up once per level, and timing_wrapper only timed
+# the root. Their only counters were the node totals (blocks,
+# positions_analyzed, nodes_visited).
+#
+# A SearchInstrumentation passed to an agent (instrumentation=...) collects,
+# over every move the agent makes:
+#   - positions searched per depth (plies below the root; depth 0 counts the roots)
+#   - beta cutoffs and how many the first move searched produced
+#   - transposition table probes and hits
+#   - static evaluations
+#   - nanosecond time per root search (time.perf_counter_ns around the move only)
+# and exports them as JSON or Prometheus text.
+#
+# Nothing of it runs when no instrumentation is attached: the agents then
+# build a plain AlphaBetaSearch and call their own recursive methods. With one
+# attached, they build an InstrumentedSearch (counting in overrides) or get
+# counting wrappers installed over their recursive methods. Cutoffs and table
+# statistics come from the in-place search's own counters; the list-state
+# searches (the agents' max/min methods) only report positions per depth, and
+# evaluations where the agent has an evaluation method of its own.
+
+import time
+from functools import wraps
+
+from search import AlphaBetaSearch
+
+#metric name prefix of the Prometheus export
+METRIC_PREFIX = 'breakthrough_search'
+
+
+class SearchInstrumentation:
+
+    def __init__(self):
+        self.reset()
+        #in-place searches of the current root, folded in when it finishes
+        self._searches = []
+
+    def reset(self):
+        self.roots = 0
+        self.root_ns = 0
+        self.max_root_ns = 0
+        self.nodes_by_depth = [0]
+        self.quiescence_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.evaluations = 0
+
+    def count_node(self, depth):
+        counts = self.nodes_by_depth
+        if depth >= len(counts):
+            counts.extend([0] * (depth + 1 - len(counts)))
+        counts[depth] += 1
+
+    def attach(self, agent, methods, depth_index, evaluate=None):
+        # Installs counting wrappers over an agent's recursive search methods (an
+        # instance attribute per name, so the recursion goes through them);
+        # depth_index is the position of the depth among each method's arguments.
+        # evaluate: name of the agent's evaluation method, counted the same way
+        for name in methods:
+            setattr(agent, name, self._counted_method(getattr(agent, name), depth_index))
+        if evaluate is not None:
+            setattr(agent, evaluate, self.counted_evaluate(getattr(agent, evaluate)))
+
+    def _counted_method(self, method, depth_index):
+        count_node = self.count_node
+
+        @wraps(method)
+        def counted(*args):
+            count_node(args[depth_index])
+            return method(*args)
+        return counted
+
+    def counted_evaluate(self, evaluate):
+        @wraps(evaluate)
+        def counted(state):
+            self.evaluations += 1
+            return evaluate(state)
+        return counted
+
+    def _register(self, search):
+        #an InstrumentedSearch made for the current root, with the table counters it starts from
+        tt = search.tt
+        self._searches.append((search, (tt.probes, tt.hits) if tt is not None else None))
+
+    def root_done(self, elapsed_ns):
+        #one move finished: its root time, and the counters of the in-place searches it ran
+        self.roots += 1
+        self.root_ns += elapsed_ns
+        self.max_root_ns = max(self.max_root_ns, elapsed_ns)
+        self.count_node(0)
+        for search, table_start in self._searches:
+            self.quiescence_nodes += search.quiescence_nodes
+            self.cutoffs += search.cutoffs
+            self.first_move_cutoffs += search.first_move_cutoffs
+            if table_start is not None:
+                self.tt_probes += search.tt.probes - table_start[0]
+                self.tt_hits += search.tt.hits - table_start[1]
+        self._searches = []
+
+    def stats(self):
+        return {
+            'roots': self.roots,
+            'root_ns': self.root_ns,
+            'max_root_ns': self.max_root_ns,
+            'nodes': sum(self.nodes_by_depth) + self.quiescence_nodes,
+            'nodes_by_depth': list(self.nodes_by_depth),
+            'quiescence_nodes': self.quiescence_nodes,
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': self.tt_hits / self.tt_probes if self.tt_probes else 0.0,
+            'evaluations': self.evaluations,
+        }
+
+    def to_json(self, **kwargs):
+        import json
+        return json.dumps(self.stats(), **kwargs)
+
+    def to_prometheus(self, labels=None, prefix=METRIC_PREFIX):
+        # The stats in the Prometheus text exposition format; labels ({name: value})
+        # are added to every sample, e.g. {'agent': 'alphabeta'}
+        base = ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                        for name, value in sorted((labels or {}).items()))
+
+        def sample(name, value, extra=''):
+            label_text = ','.join(part for part in (base, extra) if part)
+            return '%s_%s%s %s' % (prefix, name, '{%s}' % label_text if label_text else '', value)
+
+        stats = self.stats()
+        lines = []
+        metrics = [
+            ('roots_total', 'counter', "Root searches (moves) timed.", [('', stats['roots'])]),
+            ('root_seconds_total', 'counter', "Time spent in root searches.", [('', stats['root_ns'] / 1e9)]),
+            ('root_seconds_max', 'gauge', "Longest root search.", [('', stats['max_root_ns'] / 1e9)]),
+            ('nodes_total', 'counter', "Positions searched by plies below the root.",
+             [('depth="%d"' % depth, count) for depth, count in enumerate(stats['nodes_by_depth'])]),
+            ('quiescence_nodes_total', 'counter', "Positions searched by the quiescence search.",
+             [('', stats['quiescence_nodes'])]),
+            ('cutoffs_total', 'counter', "Beta cutoffs.", [('', stats['cutoffs'])]),
+            ('first_move_cutoffs_total', 'counter', "Beta cutoffs by the first move searched.",
+             [('', stats['first_move_cutoffs'])]),
+            ('first_move_cutoff_ratio', 'gauge', "Share of the cutoffs made by the first move.",
+             [('', stats['first_move_rate'])]),
+            ('tt_probes_total', 'counter', "Transposition table probes.", [('', stats['tt_probes'])]),
+            ('tt_hits_total', 'counter', "Transposition table probes that found the position.",
+             [('', stats['tt_hits'])]),
+            ('evaluations_total', 'counter', "Static evaluations.", [('', stats['evaluations'])]),
+        ]
+        for name, kind, help_text, samples in metrics:
+            lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+            lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+            lines.extend(sample(name, value, extra) for extra, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+class InstrumentedSearch(AlphaBetaSearch):
+    # AlphaBetaSearch counting positions per depth and evaluations into a
+    # SearchInstrumentation; the agents build it only while one is attached
+
+    def __init__(self, instrumentation, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instrumentation = instrumentation
+        instrumentation._register(self)
+
+    def _negamax(self, depth, alpha, beta, ply=1):
+        self.instrumentation.count_node(ply)
+        return AlphaBetaSearch._negamax(self, depth, alpha, beta, ply)
+
+    def _leaf(self, state):
+        self.instrumentation.evaluations += 1
+        return AlphaBetaSearch._leaf(self, state)
+
+
+def new_search(instrumentation, *args, **kwargs):
+    #AlphaBetaSearch(*args, **kwargs), counting into instrumentation unless it is None
+    if instrumentation is None:
+        return AlphaBetaSearch(*args, **kwargs)
+    return InstrumentedSearch(instrumentation, *args, **kwargs)
+
+
+def timed_root(attribute=None):
+    # Decorator for an agent's root method (one call per move, never recursive):
+    # adds the call's duration in seconds to the agent's attribute, and reports
+    # it to the agent's instrumentation when one is attached.
+    def decorate(method):
+        @wraps(method)
+        def timed(agent, *args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(agent, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                if attribute is not None:
+                    setattr(agent, attribute, getattr(agent, attribute) + elapsed / 1e9)
+                if agent.instrumentation is not None:
+                    agent.instrumentation.root_done(elapsed)
+        return timed
+    return decorate
@@ -1,6 +1,10 @@
-import numpy as np
+import random
 from functools import wraps
 from typing import Tuple, List, Optional, Callable
+from bitboard import BitboardGameState
+from evaluation import piece_square_tables, GAME_STATE_HEURISTICS, NO_HEURISTIC
+from parallel import RootSplitSearch
+from instrumentation import new_search, timed_root
 
 #The game boundaries and limits
 INFINITY_POS = float("inf")
@@ -8,22 +12,6 @@ INFINITY_NEG = -float("inf")
 MAX_BOUNDARY = (INFINITY_POS, INFINITY_POS)
 MIN_BOUNDARY = (INFINITY_NEG, INFINITY_NEG)
 
-# the decorators to track how much time a method takes to run
-def track_analysis_time(method):
-
-    #Decorator to track time spent on position analysis
-    @wraps(method)
-    def timed_analysis(*args, **kwargs):
-        import time
-        start = time.time()
-        result = method(*args, **kwargs)
-        end = time.time()
-        instance = args[0]
-        if hasattr(instance, 'analysis_time'):
-            instance.analysis_time += end - start
-        return result
-    return timed_analysis
-
 def adaptive_depth_control(method):
 
     #Decoratos to adjust search depth based on game phase (when left with fewer pieces)
@@ -71,6 +59,27 @@ class PositionEvaluator:
                         coordination_score += 0.5
         return coordination_score
 
+    @staticmethod
+    def batch_piece_coordination(boards, player: int) -> 'np.ndarray':
+        # evaluate_piece_coordination for many positions at once: boards is an
+        # (N, height, width) array of board matrices, the result the N scores of player.
+        # Each pair within 2 rows/columns is counted once per relative offset
+        # (the 12 offsets pointing "forward" in reading order) instead of twice at 0.5.
+        # NumPy is imported here, so the agents load without it.
+        import numpy as np
+        pieces = np.asarray(boards) == player
+        n, height, width = pieces.shape
+        pairs = np.zeros(n, dtype=np.int64)
+        for dr in range(0, 3):
+            for dc in range(-2, 3):
+                if dr == 0 and dc <= 0:
+                    continue
+                c0, c1 = max(0, -dc), min(width, width - dc)
+                a = pieces[:, :height - dr, c0:c1]
+                b = pieces[:, dr:, c0 + dc:c1 + dc]
+                pairs += (a & b).sum(axis=(1, 2))
+        return pairs.astype(float)
+
     #measures how many pieces control the centere columns
     @staticmethod
     def evaluate_center_control(positions: List[Tuple[int, int]], width: int) -> float:
@@ -114,7 +123,9 @@ class GameMove:
 class TreeSearchAgent:
     #Game AI using enhanced Minimax tree search strategy with position evaluation.
 
-    def __init__(self, board_config, player, search_depth, eval_func, variant=0):
+    def __init__(self, board_config, player, search_depth, eval_func, variant=0, bitboard=False, in_place=False, tt=None,
+                 workers=1, quiescence=False, pvs=False, lmr=False, futility=False, threats=False,
+                 tablebase=None, book=None, book_random=False, instrumentation=None, measure_parallel=False):
         
         #Configures the search agent parameters.
         
@@ -123,19 +134,59 @@ class TreeSearchAgent:
            # search_depth (int): Maximum search depth
            # eval_func (callable): Position evaluation method
            # variant (int): Game variant selector
+           # bitboard (bool): Search on BitboardGameState instead of GameState
+           # in_place (bool): Make/unmake search (search.py) on the bitboard
+           # tt (TranspositionTable): Table for the in-place search, kept across moves
+           # workers (int): More than 1 splits the root moves over a process pool (parallel.py)
+           # measure_parallel (bool): The parallel search also runs the serial one, for speedup and overhead
+           # quiescence (bool): Search moves onto the last two rows past the depth limit (in-place search)
+           # pvs (bool): Principal variation search with null windows (in-place search)
+           # lmr, futility (bool): Late-move reductions / futility pruning of quiet moves (in-place search)
+           # threats (bool): Score decided races near a win and extend goal threats (in-place search)
+           # tablebase (Tablebase): Endgame table probed by the in-place search (tablebase.py)
+           # book (OpeningBook): Moves played without searching while it has the position (book.py)
+           # book_random (bool): Pick among the book's moves by weight instead of the heaviest
+           # instrumentation (SearchInstrumentation): Collects search counters and root times (instrumentation.py)
        
         self.board_config = board_config
+        self.workers = workers
+        self.measure_parallel = measure_parallel
+        self.parallel_report = {}
+        self.quiescence = quiescence
+        self.pvs = pvs
+        self.lmr = lmr
+        self.futility = futility
+        self.threats = threats
+        self.tablebase = tablebase
+        self.book = book
+        self.book_random = book_random
+        self.search_stats = {}
+        self.in_place = (in_place or tt is not None or workers > 1 or quiescence or pvs or lmr or futility
+                         or threats or tablebase is not None)
+        self.bitboard = bitboard or self.in_place
+        self.tt = tt
         self.player = player
         self.depth_ceiling = search_depth
         self.eval_func = eval_func
         self.variant = variant
         self.positions_analyzed = 0
         self.pieces_remaining = 0
-        self.analysis_time = 0
+        self.analysis_time = 0 #seconds spent in find_best_move
         self.evaluator = PositionEvaluator()
+        self.instrumentation = instrumentation
+        if instrumentation is not None and not self.in_place:
+            instrumentation.attach(self, ('evaluate_player_moves', 'evaluate_opponent_moves'), 1,
+                                   evaluate='_evaluate_position')
+
+    def __getstate__(self):
+        #the parallel search ships the agent's evaluation to the workers; the table stays here
+        state = self.__dict__.copy()
+        state['tt'] = None
+        state['instrumentation'] = None
+        return state
 
 #Main function to find the best move using minimax + evaluation
-    @track_analysis_time
+    @timed_root('analysis_time')
     @adaptive_depth_control
     def find_best_move(self):
         
@@ -145,7 +196,33 @@ class TreeSearchAgent:
         alpha = INFINITY_NEG
         beta = INFINITY_POS
 
-        possible_moves = self._order_moves(root_position.available_actions(), root_position)
+        book_move = None
+        if self.book is not None:
+            book_move = self.book.action(self.board_config, self.player, 5 if self.variant else 8,
+                                         10 if self.variant else 8, random if self.book_random else None)
+        if book_move is not None:
+            selected_move = book_move
+            possible_moves = []
+        elif self.workers > 1:
+            search = RootSplitSearch(root_position, self.player, self._evaluate_position, self._order_bit_moves,
+                                     workers=self.workers, quiescence=self.quiescence, pvs=self.pvs, lmr=self.lmr,
+                                     futility=self.futility, threats=self.threats, tablebase=self.tablebase)
+            move, highest_score = search.search(self.depth_ceiling, measure=self.measure_parallel)
+            self.positions_analyzed += search.nodes
+            self.parallel_report = search.report
+            selected_move = root_position.to_action(move)
+            possible_moves = []
+        elif self.in_place:
+            search = new_search(self.instrumentation, root_position, self.player, self._evaluate_position,
+                                self._order_bit_moves, tt=self.tt, quiescence=self.quiescence, pvs=self.pvs,
+                                lmr=self.lmr, futility=self.futility, threats=self.threats, tablebase=self.tablebase)
+            move, highest_score = search.search(self.depth_ceiling)
+            self.positions_analyzed += search.nodes
+            self.search_stats = search.stats()
+            selected_move = root_position.to_action(move)
+            possible_moves = []
+        else:
+            possible_moves = self._order_moves(root_position.available_actions(), root_position)
         
         #sortds and evaluates all legal moves
         for possible_move in possible_moves:
@@ -169,25 +246,37 @@ class TreeSearchAgent:
     def _order_moves(self, moves, position):
         """Orders moves based on preliminary evaluation for better pruning"""
         def move_score(move):
+            if self.bitboard:
+                # bitboard moves already know their target and whether they capture
+                return self._move_priority(move.target, move.capture, move.player)
             new_pos = calculate_move(move.position, move.move_dir, move.player)
-            score = 0
+            captures = (move.player == 1 and new_pos in position.crystal_pieces) or \
+                       (move.player == 2 and new_pos in position.onyx_pieces)
+            return self._move_priority(new_pos, captures, move.player)
+            
+        return sorted(moves, key=move_score, reverse=True)
 
-            # prioritizes the captures
-            if (move.player == 1 and new_pos in position.crystal_pieces) or \
-               (move.player == 2 and new_pos in position.onyx_pieces):
-                score += 10
+    def _order_bit_moves(self, position, moves):
+        #same ordering for the encoded moves of the in-place search
+        return sorted(moves, key=lambda move: self._move_priority(
+            position.target_of(move), position.is_capture(move), position.player), reverse=True)
 
-            # prioritizes the center control
-            if 2 <= new_pos[1] <= 5:
-                score += 5
+    @staticmethod
+    def _move_priority(new_pos, captures, player):
+        score = 0
 
-            # prioritizes the forward movement
-            score += new_pos[0] if move.player == 1 else (7 - new_pos[0])
-            return score
-            
-        return sorted(moves, key=move_score, reverse=True)
+        # prioritizes the captures
+        if captures:
+            score += 10
+
+        # prioritizes the center control
+        if 2 <= new_pos[1] <= 5:
+            score += 5
+
+        # prioritizes the forward movement
+        score += new_pos[0] if player == 1 else (7 - new_pos[0])
+        return score
 
-    @track_analysis_time
     def evaluate_player_moves(self, position, depth, alpha, beta):
         #Enhanced analysis of maximizing player's options
         if depth == self.depth_ceiling or position.isgoalstate():
@@ -205,7 +294,6 @@ class TreeSearchAgent:
                 break  # Beta cutoff
         return max_score
 
-    @track_analysis_time
     def evaluate_opponent_moves(self, position, depth, alpha, beta):
         #Enhanced analysis of minimizing player's options
         if depth == self.depth_ceiling or position.isgoalstate():
@@ -232,14 +320,19 @@ class TreeSearchAgent:
         score = position.utility(self.player)
         
         # add positional factors and center control evaluation
-        if self.player == 1:
+        if hasattr(position, 'coordination'):
+            #bitboard states keep both coordination scores updated move by move
+            score += position.coordination(self.player) - position.coordination(3 - self.player)
+        elif self.player == 1:
             score += (self.evaluator.evaluate_piece_coordination(position.onyx_pieces) -
                      self.evaluator.evaluate_piece_coordination(position.crystal_pieces))
-            score += (self.evaluator.evaluate_center_control(position.onyx_pieces, position.width) -
-                     self.evaluator.evaluate_center_control(position.crystal_pieces, position.width))
         else:
             score += (self.evaluator.evaluate_piece_coordination(position.crystal_pieces) -
                      self.evaluator.evaluate_piece_coordination(position.onyx_pieces))
+        if self.player == 1:
+            score += (self.evaluator.evaluate_center_control(position.onyx_pieces, position.width) -
+                     self.evaluator.evaluate_center_control(position.crystal_pieces, position.width))
+        else:
             score += (self.evaluator.evaluate_center_control(position.crystal_pieces, position.width) -
                      self.evaluator.evaluate_center_control(position.onyx_pieces, position.width))
         
@@ -247,6 +340,12 @@ class TreeSearchAgent:
 
     def _create_game_state(self):
         #Initializes GameState object based on board configuration
+        if self.bitboard:
+            return BitboardGameState.from_matrix(
+                self.board_config, self.player, self.eval_func,
+                width=10 if self.variant else 8,
+                height=5 if self.variant else 8
+            )
         return GameState(
             board_config=self.board_config,
             player=self.player,
@@ -338,13 +437,9 @@ class GameState:
                new_pos not in self.onyx_pieces and new_pos not in self.crystal_pieces
 
     def utility(self, turn):
-        #calculates the utility of the current state
-        if self.eval_func == 0:
-            return 0
-        elif self.eval_func == 1:
-            return self.offensive_function(turn)
-        elif self.eval_func == 2:
-            return self.defensive_function(turn)
+        #calculates the utility of the current state with the compiled heuristic (evaluation.py)
+        heuristic = GAME_STATE_HEURISTICS.get(self.eval_func, NO_HEURISTIC)
+        return heuristic(self.myscore(turn), self.enemyscore(turn))
 
     def isgoalstate(self):
         #determines if the current state is a goal state
@@ -366,21 +461,21 @@ class GameState:
     #Heuristic scoring functions are implemented here
     def offensive_function(self, turn):
         
-        return 2 * self.myscore(turn) - self.enemyscore(turn)
+        return GAME_STATE_HEURISTICS[1](self.myscore(turn), self.enemyscore(turn))
 
     def defensive_function(self, turn):
         
-        return self.myscore(turn) - 2 * self.enemyscore(turn)
+        return GAME_STATE_HEURISTICS[2](self.myscore(turn), self.enemyscore(turn))
 
     def myscore(self, turn):
-     
+        #pieces plus rows advanced, summed from the piece-square table
+        values = piece_square_tables(self.height, self.width, self.height - 1)[turn]
         positions = self.onyx_pieces if turn == 1 else self.crystal_pieces
-        return len(positions) + sum(pos[0] if turn == 1 else self.height - 1 - pos[0] for pos in positions)
+        return sum(values[row * self.width + col] for row, col in positions)
 
     def enemyscore(self, turn):
         
-        enemy_positions = self.crystal_pieces if turn == 1 else self.onyx_pieces
-        return len(enemy_positions) + sum(pos[0] if turn == 2 else self.height - 1 - pos[0] for pos in enemy_positions)
+        return self.myscore(switch_player(turn))
 
 
 #heuristics functions with empty placeholders, this can be customized
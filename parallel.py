@@ -0,0 +1,177 @@
+#Root-split parallel search.
+#
+# The first root move is searched in this process to get a bound (alpha); the
+# remaining root moves are then searched in worker processes, each with the
+# window (alpha, inf). A move scoring above alpha gets an exact score, the rest
+# only an upper bound, so picking the first move with the highest score gives
+# the same move as the serial root loop of AlphaBetaSearch.search().
+
+import os
+import time
+
+from search import AlphaBetaSearch, INFINITY
+
+_executors = {}
+
+
+def pool_size(workers=None):
+    #the worker count get_executor(workers) starts its pool with
+    return workers or os.cpu_count() or 1
+
+
+def get_executor(workers=None):
+    #one process pool per worker count, started on first use and reused for every move
+    workers = pool_size(workers)
+    if workers not in _executors:
+        #imported here: most processes importing the searches never start a pool
+        from concurrent.futures import ProcessPoolExecutor
+        _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _executors[workers]
+
+
+def shutdown_executors():
+    for executor in _executors.values():
+        executor.shutdown(cancel_futures=True)
+    _executors.clear()
+
+
+def _search_root_move(state, player, evaluate, order, prune, options, move, depth, alpha):
+    #worker task: score of one root move, with the nodes and seconds it took
+    start = time.perf_counter()
+    search = AlphaBetaSearch(state, player, evaluate, order, prune=prune, **options)
+    score = search.search_move(move, depth, alpha)
+    return score, search.nodes, time.perf_counter() - start
+
+
+class RootSplitSearch:
+
+    def __init__(self, state, player, evaluate, order=None, workers=None, prune=True, **options):
+        # state, player, evaluate, order, prune: as for AlphaBetaSearch; evaluate
+        #   and order are sent to the workers, so they must be picklable
+        # workers (int): pool size, defaults to the number of cores
+        # options: further AlphaBetaSearch keywords (move_ordering, quiescence, ...)
+        self.state = state
+        self.player = player
+        self.evaluate = evaluate
+        self.order = order
+        self.workers = pool_size(workers)
+        self.prune = prune
+        self.options = options
+        self.nodes = 0
+        self.report = {}
+
+    def search(self, depth, measure=False):
+        # Returns (best move, score) like AlphaBetaSearch.search().
+        # self.report gets the wall time, the nodes and the summed worker time of
+        # the move; measure=True also runs the serial search to add its time and
+        # nodes, the speedup and the search overhead (extra nodes in percent).
+        start = time.perf_counter()
+        local = AlphaBetaSearch(self.state, self.player, self.evaluate, self.order, prune=self.prune, **self.options)
+        moves = local.ordered_moves(self.state)
+        busy = 0.0
+
+        goal = next((move for move in moves if local.is_immediate_goal(move)), None)
+        if goal is not None or len(moves) < 2:
+            #nothing to split
+            best_move, best = local.search(depth)
+            self.nodes = local.nodes
+        else:
+            best_move = moves[0]
+            best = local.search_move(best_move, depth)
+            alpha = best if self.prune else -INFINITY
+            busy = time.perf_counter() - start
+            executor = get_executor(self.workers)
+            futures = [executor.submit(_search_root_move, self.state, self.player, self.evaluate, self.order,
+                                       self.prune, self.options, move, depth, alpha)
+                       for move in moves[1:]]
+            self.nodes = local.nodes
+            for move, future in zip(moves[1:], futures):
+                score, nodes, elapsed = future.result()
+                self.nodes += nodes
+                busy += elapsed
+                if score > best:
+                    best_move, best = move, score
+
+        elapsed = time.perf_counter() - start
+        self.report = {'workers': self.workers, 'depth': depth, 'nodes': self.nodes, 'time': elapsed,
+                       'worker_time': busy, 'parallelism': busy / elapsed if elapsed else 0.0}
+        if measure:
+            serial = AlphaBetaSearch(self.state, self.player, self.evaluate, self.order, prune=self.prune,
+                                     **self.options)
+            serial_start = time.perf_counter()
+            serial_move, _ = serial.search(depth)
+            serial_time = time.perf_counter() - serial_start
+            self.report.update({
+                'serial_nodes': serial.nodes,
+                'serial_time': serial_time,
+                'same_move': serial_move == best_move,
+                'speedup': serial_time / elapsed if elapsed else 0.0,
+                'overhead': 100.0 * (self.nodes - serial.nodes) / serial.nodes if serial.nodes else 0.0,
+            })
+        return best_move, best
+
+
+def _lazy_helper(state, player, evaluate, order, options, table, max_depth, time_limit, helper):
+    # Lazy SMP helper task: the same iterative deepening as the main search, filling
+    # the shared table until the main search raises the table's stop flag.
+    # Helpers start one or two plies in so they run ahead of the main search.
+    table.reset_stats()
+    search = AlphaBetaSearch(state, player, evaluate, order, tt=table, **options)
+    search.stop = lambda: table.stop_requested
+    search.iterative_deepening(max_depth, time_limit, start_depth=min(max_depth, 2 - helper % 2))
+    return search.nodes, search.depth_reached, table.stats()
+
+
+class LazySMPSearch:
+    # Lazy SMP: helper processes search the same root as the main search and share
+    # a SharedTranspositionTable with it, so the main search finds the helpers'
+    # results (cutoffs, exact scores, best moves) in the table. Only the main
+    # search's result is used; the helpers are stopped as soon as it completes.
+
+    def __init__(self, state, player, evaluate, table, order=None, helpers=None, **options):
+        # table (SharedTranspositionTable): the table shared by all processes
+        # helpers (int): helper processes, defaults to one less than the number of cores
+        # state, player, evaluate, order: as for AlphaBetaSearch (sent to the helpers)
+        # options: further AlphaBetaSearch keywords (move_ordering, quiescence, ...)
+        if not hasattr(table, 'request_stop'):
+            raise ValueError("Lazy SMP needs a SharedTranspositionTable")
+        self.state = state
+        self.player = player
+        self.evaluate = evaluate
+        self.table = table
+        self.order = order
+        self.options = options
+        self.helpers = helpers if helpers is not None else max(1, (os.cpu_count() or 2) - 1)
+        self.nodes = 0
+        self.report = {}
+
+    def iterative_deepening(self, max_depth, time_limit=None):
+        #returns (best move, score, depth) of the main search, like AlphaBetaSearch
+        start = time.perf_counter()
+        table = self.table
+        table.request_stop(False)
+        futures = []
+        if self.helpers:
+            executor = get_executor(self.helpers)
+            futures = [executor.submit(_lazy_helper, self.state, self.player, self.evaluate, self.order,
+                                       self.options, table, max_depth, time_limit, helper)
+                       for helper in range(self.helpers)]
+
+        main = AlphaBetaSearch(self.state, self.player, self.evaluate, self.order, tt=table, **self.options)
+        try:
+            move, score, depth = main.iterative_deepening(max_depth, time_limit)
+        finally:
+            table.request_stop()
+        elapsed = time.perf_counter() - start
+
+        helper_nodes, helper_depths = 0, []
+        for future in futures:
+            nodes, helper_depth, _ = future.result()
+            helper_nodes += nodes
+            helper_depths.append(helper_depth)
+        self.nodes = main.nodes
+        self.report = {'helpers': self.helpers, 'depth': depth, 'time': elapsed, 'nodes': main.nodes,
+                       'helper_nodes': helper_nodes, 'helper_depths': helper_depths,
+                       'nodes_per_second': main.nodes / elapsed if elapsed else 0.0,
+                       'table': table.stats()}
+        return move, score, depth
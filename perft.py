@@ -0,0 +1,165 @@
+#Perft: move generator validation and speed.
+#
+# Counts the positions reachable in exactly N plies from reference positions,
+# with every state implementation, and compares them with counts checked by
+# an independent board-matrix generator (the 8x8 start agrees with the
+# published Breakthrough perft). A wrong count means a move generator, a
+# capture rule or a game-over check is broken. Games end when a piece reaches
+# the far row or a side has no pieces; nothing is counted past that.
+#
+# The nodes per second of each implementation are reported, so a move
+# generation speedup should show the same counts and a higher rate.
+#
+#   python perft.py                        # every position and implementation to depth 3
+#   python perft.py --depth 4 --impl bitboard-make --impl bitboard-game-make
+#   python perft.py --position 8x8-start --depth 5 --json perft.json
+#
+# Exits with 1 when any count is wrong.
+
+import argparse
+import json
+import sys
+import time
+
+# name -> (board rows top to bottom, b = black, w = white; side to move)
+POSITIONS = {
+    '8x8-start': ('bbbbbbbb/bbbbbbbb/......../......../......../......../wwwwwwww/wwwwwwww', 1),
+    '8x8-middle': ('bbb.bbb./.b.bb..b/..b....b/...w.b../..w.w.../w.....w./.ww.ww.w/ww.wwww.', 2),
+    '8x8-race': ('..b...../......../....b.../.w....../......w./..b...../.....w../w.......', 1),
+    '5x10-start': ('bbbbbbbbbb/bbbbbbbbbb/........../wwwwwwwwww/wwwwwwwwww', 1),
+    '5x10-middle': ('bb.bbb.b.b/.b..b.bb../..bw.w..b./w..ww..w.w/.ww.ww.ww.', 2),
+}
+
+# (position, captures) -> counts at depth 1, 2, ...; captures is State's rule set
+# (diagonal moves may take an enemy piece), without it GameState's (empty squares only)
+REFERENCE = {
+    ('8x8-start', True): (22, 484, 11132, 256036, 6182818),
+    ('8x8-start', False): (22, 484, 11132, 256036, 6181884),
+    ('8x8-middle', True): (29, 717, 21154, 529175, 15742051),
+    ('8x8-middle', False): (27, 616, 16943, 390905, 10825554),
+    ('8x8-race', True): (9, 99, 872, 8208, 70518),
+    ('8x8-race', False): (9, 97, 827, 7524, 62046),
+    ('5x10-start', True): (28, 756, 20534, 544764, 14703118),
+    ('5x10-start', False): (28, 704, 16700, 360978, 7531630),
+    ('5x10-middle', True): (26, 682, 17447, 439707, 10876944),
+    ('5x10-middle', False): (20, 408, 7946, 154196, 2859562),
+}
+
+
+def parse_position(rows):
+    #the board matrix (1 = black, 2 = white) of a POSITIONS string
+    return [[{'b': 1, 'w': 2, '.': 0}[square] for square in row] for row in rows.split('/')]
+
+
+def perft_copy(state, depth):
+    #counts through available_actions()/transfer(), a new state per move (the agents' copy path)
+    if depth == 0:
+        return 1
+    if state.isgoalstate():
+        return 0
+    nodes = 0
+    for action in state.available_actions():
+        nodes += perft_copy(state.transfer(action), depth - 1)
+    return nodes
+
+
+def perft_make(state, depth):
+    #counts through generate_moves()/make()/unmake() on one state (the in-place search's path)
+    if depth == 0:
+        return 1
+    if state.winner:
+        return 0
+    nodes = 0
+    for move in state.generate_moves():
+        state.make(move)
+        nodes += perft_make(state, depth - 1)
+        state.unmake()
+    return nodes
+
+
+def _state(matrix, turn, height, width):
+    from engine import State
+    return State(BoardRepresentation=matrix, turn=turn, width=width, height=height)
+
+
+def _game_state(matrix, turn, height, width):
+    from minimax_agent import GameState
+    return GameState(board_config=matrix, player=turn, width=width, height=height)
+
+
+def _bitboard(matrix, turn, height, width):
+    from bitboard import BitboardState
+    return BitboardState.from_matrix(matrix, turn, 0, width, height)
+
+
+def _bitboard_game(matrix, turn, height, width):
+    from bitboard import BitboardGameState
+    return BitboardGameState.from_matrix(matrix, turn, 0, width, height)
+
+
+# name -> (state factory, perft function, captures)
+IMPLEMENTATIONS = {
+    'state': (_state, perft_copy, True),                      # State (engine.py)
+    'game-state': (_game_state, perft_copy, False),           # GameState (minimax_agent.py)
+    'bitboard': (_bitboard, perft_copy, True),                # BitboardState as the agents copy it
+    'bitboard-make': (_bitboard, perft_make, True),           # BitboardState as search.py makes moves
+    'bitboard-game': (_bitboard_game, perft_copy, False),     # BitboardGameState (TreeSearchAgent)
+    'bitboard-game-make': (_bitboard_game, perft_make, False),
+}
+
+
+def run_perft(implementation, position, depth):
+    # {'nodes', 'expected', 'seconds', 'nps', 'ok'} for one implementation, position and depth;
+    # expected is None past the reference counts
+    make_state, perft, captures = IMPLEMENTATIONS[implementation]
+    rows, turn = POSITIONS[position]
+    matrix = parse_position(rows)
+    state = make_state(matrix, turn, len(matrix), len(matrix[0]))
+    start = time.perf_counter()
+    nodes = perft(state, depth)
+    seconds = time.perf_counter() - start
+    reference = REFERENCE[(position, captures)]
+    expected = reference[depth - 1] if depth <= len(reference) else None
+    return {'implementation': implementation, 'position': position, 'depth': depth, 'nodes': nodes,
+            'expected': expected, 'seconds': seconds, 'nps': nodes / seconds if seconds else 0.0,
+            'ok': expected is None or nodes == expected}
+
+
+def format_results(results):
+    lines = ["%-20s %-12s %5s %10s %10s %12s  %s" % ('implementation', 'position', 'depth', 'nodes', 'seconds',
+                                                     'nodes/s', 'check')]
+    for r in results:
+        if r['expected'] is None:
+            check = 'no reference'
+        else:
+            check = 'ok' if r['ok'] else 'WRONG (expected %d)' % r['expected']
+        lines.append("%-20s %-12s %5d %10d %10.3f %12.0f  %s" % (r['implementation'], r['position'], r['depth'],
+                                                                r['nodes'], r['seconds'], r['nps'], check))
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Count and time move generation from reference positions.")
+    parser.add_argument('--depth', type=int, default=3, help="plies to count (default 3)")
+    parser.add_argument('--position', action='append', choices=sorted(POSITIONS),
+                        help="reference position (repeatable, default all)")
+    parser.add_argument('--impl', action='append', choices=sorted(IMPLEMENTATIONS),
+                        help="state implementation (repeatable, default all)")
+    parser.add_argument('--json', help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = [run_perft(implementation, position, args.depth)
+               for implementation in args.impl or IMPLEMENTATIONS
+               for position in args.position or POSITIONS]
+    print(format_results(results))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#Drawing for StrategicGame.
+#
+# The window used to be redrawn from scratch every frame: board, 64 cells,
+# side panel, six match buttons, with new Font objects and every text rendered
+# again. Almost all of it never changes, so the board image, the panel, its
+# buttons and labels are drawn once into a background surface. A frame then
+# only restores the squares whose piece changed (and the turn and time texts
+# when they change) from the background, and reports those rectangles for
+# pygame.display.update(). A frame where nothing changed draws nothing.
+
+import pygame
+
+#the panel's layout: everything right of the board
+PANEL_RECT = pygame.Rect(720, 0, 260, 750)
+RESET_RECT = pygame.Rect(735, 15, 230, 40)
+TURN_RECT = pygame.Rect(735, 95, 230, 30)     # where "Black" / "White" goes
+TIME_RECT = pygame.Rect(735, 690, 230, 40)
+BUTTON_TOP, BUTTON_HEIGHT, BUTTON_SPACING = 180, 80, 5
+
+WHITE, BLACK, PANEL_GREY = (255, 255, 255), (0, 0, 0), (240, 240, 240)
+
+#Matchup descriptions
+MODES = [
+    ("Match 1:", "Minimax (Off1)", "vs", "Alpha-beta (Off1)"),
+    ("Match 2:", "Alpha-beta (Off2)", "vs", "Alpha-beta (Def1)"),
+    ("Match 3:", "Alpha-beta (Def2)", "vs", "Alpha-beta (Off1)"),
+    ("Match 4:", "Alpha-beta (Off2)", "vs", "Alpha-beta (Off1)"),
+    ("Match 5:", "Alpha-beta (Def2)", "vs", "Alpha-beta (Def1)"),
+    ("Match 6:", "Alpha-beta (Off2)", "vs", "Alpha-beta (Def2)")
+]
+
+
+class BoardRenderer:
+
+    def __init__(self, window, board_image, pieces, victory_icon, grid_size):
+        # window (Surface): the display surface
+        # board_image (Surface): the board, drawn at the top left
+        # pieces (dict): player -> piece image, drawn 15 px inside its square
+        # victory_icon (Surface): shown with the winner's message
+        # grid_size (int): a square's side in pixels
+        self.window = window
+        self.pieces = pieces
+        self.victory_icon = victory_icon
+        self.grid_size = grid_size
+        self.font = pygame.font.Font(None, 32)
+        self.font_small = pygame.font.Font(None, 28)
+        self.font_large = pygame.font.Font(None, 48)
+        self.turn_labels = {1: self.font.render("Black", True, BLACK), 2: self.font.render("White", True, BLACK)}
+        self.background = self._background(board_image)
+        self.invalidate()
+
+    def _background(self, board_image):
+        #the window without pieces, turn or time: drawn once
+        surface = pygame.Surface(self.window.get_size())
+        surface.fill(WHITE)
+        surface.blit(board_image, (0, 0))
+        pygame.draw.rect(surface, PANEL_GREY, PANEL_RECT)
+
+        pygame.draw.rect(surface, WHITE, RESET_RECT)
+        pygame.draw.rect(surface, BLACK, RESET_RECT, 1)
+        self._blit_text(surface, self.font, "Reset Game", RESET_RECT.center)
+        self._blit_text(surface, self.font, "Current Turn:", (850, 80))
+        self._blit_text(surface, self.font, "Game Modes", (850, 150))
+
+        for i, mode in enumerate(MODES):
+            button_y = BUTTON_TOP + i * (BUTTON_HEIGHT + BUTTON_SPACING)
+            button_rect = pygame.Rect(735, button_y, 230, BUTTON_HEIGHT)
+            pygame.draw.rect(surface, WHITE, button_rect)
+            pygame.draw.rect(surface, BLACK, button_rect, 1)
+            #title, first algorithm, versus, second algorithm
+            for text, offset in zip(mode, (20, 40, 55, 70)):
+                self._blit_text(surface, self.font_small, text, (button_rect.centerx, button_y + offset))
+
+        pygame.draw.rect(surface, WHITE, TIME_RECT)
+        pygame.draw.rect(surface, BLACK, TIME_RECT, 1)
+        return surface
+
+    @staticmethod
+    def _blit_text(surface, font, text, center):
+        rendered = font.render(text, True, BLACK)
+        surface.blit(rendered, rendered.get_rect(center=center))
+
+    def invalidate(self):
+        #the next draw() repaints the whole window (first frame, window exposed again)
+        self.board = None
+        self.player = None
+        self.time_text = None
+        self.winner = None
+
+    def draw(self, game_state, current_player, total_time, winner=None):
+        # Brings the window up to date and returns the rectangles that changed
+        # (empty when nothing did). winner: the victory message's text once the game is over.
+        if self.board is None or winner != self.winner:
+            return [self._draw_all(game_state, current_player, total_time, winner)]
+        if winner is not None:
+            #the overlay covers the window until the next reset
+            return []
+        dirty = []
+        grid = self.grid_size
+        for i, (row, drawn) in enumerate(zip(game_state, self.board)):
+            if row == drawn:
+                continue
+            for j, (piece, old) in enumerate(zip(row, drawn)):
+                if piece != old:
+                    cell = pygame.Rect(grid * j, grid * i, grid, grid)
+                    self.window.blit(self.background, cell, cell)
+                    if piece:
+                        self.window.blit(self.pieces[piece], (grid * j + 15, grid * i + 15))
+                    dirty.append(cell)
+        self.board = [list(row) for row in game_state]
+        if current_player != self.player:
+            dirty.append(self._draw_turn(current_player))
+        time_text = "Total Time: %.1fs" % total_time
+        if time_text != self.time_text:
+            dirty.append(self._draw_time(time_text))
+        return dirty
+
+    def _draw_all(self, game_state, current_player, total_time, winner):
+        window, grid = self.window, self.grid_size
+        window.blit(self.background, (0, 0))
+        for i, row in enumerate(game_state):
+            for j, piece in enumerate(row):
+                if piece:
+                    window.blit(self.pieces[piece], (grid * j + 15, grid * i + 15))
+        self.board = [list(row) for row in game_state]
+        self._draw_turn(current_player)
+        self._draw_time("Total Time: %.1fs" % total_time)
+        self.winner = winner
+        if winner is not None:
+            #the victory message over a faded window
+            overlay = pygame.Surface(window.get_size())
+            overlay.fill(WHITE)
+            overlay.set_alpha(180)
+            window.blit(overlay, (0, 0))
+            window.blit(self.victory_icon, (100, 100))
+            width, height = window.get_size()
+            self._blit_text(window, self.font_large, winner, (width // 3, height // 2))
+        return window.get_rect()
+
+    def _draw_turn(self, current_player):
+        self.window.blit(self.background, TURN_RECT, TURN_RECT)
+        label = self.turn_labels[current_player]
+        self.window.blit(label, label.get_rect(center=TURN_RECT.center))
+        self.player = current_player
+        return TURN_RECT
+
+    def _draw_time(self, time_text):
+        self.window.blit(self.background, TIME_RECT, TIME_RECT)
+        self._blit_text(self.window, self.font_small, time_text, TIME_RECT.center)
+        self.time_text = time_text
+        return TIME_RECT
@@ -0,0 +1,455 @@
+#In-place alpha-beta search over a BitboardState.
+#
+# The agents' own searches build a new state for every node through transfer().
+# AlphaBetaSearch instead plays each move on one state with make() and takes it
+# back with unmake(), so a node allocates nothing but its move list and the
+# terminal check is a single attribute read (state.winner).
+
+import math
+import time
+
+from bitboard import MOVE_SHIFT, TO_MASK
+from transposition import EXACT, LOWER, UPPER
+
+INFINITY = float("inf")
+
+#how many nodes are searched between two looks at the clock
+CLOCK_INTERVAL = 1024
+
+#plies with killer move slots; deeper nodes go without
+MAX_PLY = 128
+
+#default node limit of the quiescence search below one horizon node
+QUIESCENCE_LIMIT = 256
+
+# default half-width of the root aspiration window, and how far a failed
+# window may widen (times 4 per failure) before it opens to infinity
+ASPIRATION_WINDOW = 5.0
+ASPIRATION_MAX = 500.0
+
+# late-move reductions: from this many plies left, moves after the first
+# LMR_MOVES are searched one ply shallower first
+LMR_DEPTH = 3
+LMR_MOVES = 3
+
+# futility pruning: one ply from the horizon, quiet moves are skipped when the
+# static score plus this margin cannot reach alpha
+FUTILITY_MARGIN = 4.0
+
+# score of a game decided by BitboardState.race_result() or an endgame tablebase,
+# less the plies to the end so quicker wins score higher; still below the agents'
+# infinite goal scores
+RACE_SCORE = 1e6
+
+#how many plies threat extensions may add to a line
+MAX_EXTENSIONS = 4
+
+
+class SearchTimeout(Exception):
+    #raised inside the search when the move's deadline has passed
+    pass
+
+
+class Utility:
+    #picklable evaluate callable: the state's own utility() for one player
+    def __init__(self, player):
+        self.player = player
+
+    def __call__(self, state):
+        return state.utility(self.player)
+
+
+def null_window(alpha):
+    #the upper end of the smallest window above alpha: searching (alpha, null_window(alpha)) only tests score > alpha
+    return math.nextafter(alpha, INFINITY)
+
+
+class AlphaBetaSearch:
+
+    def __init__(self, state, player, evaluate, order=None, tt=None, prune=True, move_ordering=False,
+                 quiescence=False, quiescence_limit=QUIESCENCE_LIMIT, pvs=False, aspiration=None, lmr=False,
+                 futility=False, futility_margin=FUTILITY_MARGIN, threats=False, tablebase=None):
+        # state (BitboardState): root position, modified in place and restored
+        # player (int): the side the scores are for (1 = black, 2 = white)
+        # evaluate (callable): evaluate(state) -> score from player's point of view
+        # order (callable): order(state, moves) -> moves, None keeps generation order
+        # tt (TranspositionTable): shared table of searched positions, optional
+        # prune (bool): False searches every move, as plain minimax does
+        # move_ordering (bool): below the root, search captures, then this ply's two
+        #   killer moves, then the other moves by their history score
+        # quiescence (bool): past the depth limit, keep searching captures and moves onto
+        #   the last two rows (state.tactical_moves()) until the position is quiet;
+        #   quiescence_limit caps the nodes searched below one horizon node
+        # pvs (bool): principal variation search, the first move with the full window
+        #   and the others with a null window, searched again when they beat alpha
+        # aspiration (float): iterative deepening searches the root with the window
+        #   previous score -/+ aspiration, widening it when the score falls outside
+        # lmr (bool): late quiet moves get a reduced null-window search first, and a
+        #   full one only when it beats alpha
+        # futility (bool): skip quiet moves one ply from the horizon when the static
+        #   score + futility_margin is at most alpha
+        #   Neither touches captures, moves by pieces within two rows of the goal, or
+        #   positions where an opponent's piece is within two rows of its goal.
+        # threats (bool): leaves whose race is already decided (unstoppable runners,
+        #   goal threats) score +/- RACE_SCORE, and a move onto the row before the
+        #   goal is searched one ply deeper
+        # tablebase (Tablebase): positions the table holds score +/- RACE_SCORE from
+        #   its result instead of being searched; ignored when made for another board or rules
+        self.state = state
+        self.player = player
+        self.evaluate = evaluate
+        self.order = order
+        self.tt = tt
+        self.prune = prune
+        self.nodes = 0
+        self.deadline = None
+        self.stop = None #callable polled with the clock; True abandons the search
+        self.depth_reached = 0
+        self.immediate_goal = False
+        self.move_ordering = move_ordering
+        # quiet moves that caused a cutoff: the last two per ply, and a score per
+        # (side, from, to), indexed (side - 1) << 12 | encoded move
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [0] * (2 << 12)
+        # beta cutoffs, and how many of them the first move searched produced
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.quiescence = quiescence
+        self.quiescence_limit = quiescence_limit
+        self.quiescence_nodes = 0
+        self._budget = 0
+        self.pvs = pvs
+        self.aspiration = aspiration
+        # null-window searches repeated with the full window, and failed aspiration windows
+        self.researches = 0
+        self.aspiration_researches = 0
+        self.lmr = lmr
+        self.futility = futility
+        self.futility_margin = futility_margin
+        # reduced searches, the ones searched again at full depth, and moves skipped by futility
+        self.reductions = 0
+        self.reduction_researches = 0
+        self.futility_prunes = 0
+        self.threats = threats
+        # leaves scored from a decided race, and plies added by extensions
+        self.race_leaves = 0
+        self.extensions = 0
+        self.tablebase = tablebase if tablebase is not None and tablebase.covers(state) else None
+        self.tablebase_hits = 0
+        self._root_depth = 0
+
+    def ordered_moves(self, state, hash_move=None, ply=0):
+        moves = state.generate_moves()
+        if self.order is not None:
+            moves = self.order(state, moves)
+        if self.move_ordering and 0 < ply < MAX_PLY:
+            moves = self._order_by_history(state, moves, ply)
+        if hash_move is not None and hash_move in moves:
+            #the table's best move is searched first
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        return moves
+
+    def _order_by_history(self, state, moves, ply):
+        #captures in their given order, killers, then quiet moves by history score (stable)
+        enemy = state.white if state.turn == 1 else state.black
+        killers = self.killers[ply]
+        history, side = self.history, (state.turn - 1) << 12
+        captures, quiet, first = [], [], []
+        for move in moves:
+            if enemy >> (move & TO_MASK) & 1:
+                captures.append(move)
+            elif move == killers[0] or move == killers[1]:
+                first.append(move)
+            else:
+                quiet.append(move)
+        if len(first) == 2 and first[0] != killers[0]:
+            first.reverse()
+        quiet.sort(key=lambda move: history[side | move], reverse=True)
+        return captures + first + quiet
+
+    def _record_cutoff(self, state, move, depth, ply, index):
+        self.cutoffs += 1
+        if not index:
+            self.first_move_cutoffs += 1
+        if not self.move_ordering or (state.white if state.turn == 1 else state.black) >> (move & TO_MASK) & 1:
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        self.history[(state.turn - 1) << 12 | move] += depth * depth
+
+    def ordering_stats(self):
+        return {
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
+
+    def stats(self):
+        #every counter of the search
+        stats = {'nodes': self.nodes, 'depth': self.depth_reached, 'quiescence_nodes': self.quiescence_nodes,
+                 'researches': self.researches, 'aspiration_researches': self.aspiration_researches,
+                 'reductions': self.reductions, 'reduction_researches': self.reduction_researches,
+                 'futility_prunes': self.futility_prunes, 'race_leaves': self.race_leaves,
+                 'extensions': self.extensions, 'tablebase_hits': self.tablebase_hits}
+        stats.update(self.ordering_stats())
+        return stats
+
+    def _leaf(self, state):
+        #static score from the side to move's point of view
+        if self.threats:
+            #a finished game must outrank every decided race
+            if state.winner:
+                return INFINITY if state.winner == state.turn else -INFINITY
+            plies = state.race_result()
+            if plies:
+                self.race_leaves += 1
+                return RACE_SCORE - plies if plies > 0 else plies - RACE_SCORE
+        score = self.evaluate(state)
+        return score if state.turn == self.player else -score
+
+    def iterative_deepening(self, max_depth, time_limit=None, start_depth=1, known=None):
+        # Searches depth start_depth, start_depth + 1, ... max_depth until time_limit
+        # seconds have passed. Each iteration searches the previous best move first;
+        # the result of the deepest completed iteration is returned as
+        # (best move, score, depth). The first iteration ignores the time limit so
+        # there is a move to play (self.stop can still abandon it).
+        # known: (move, score, depth) of an earlier search of this position (pondering);
+        # deepening goes on from the next depth and every iteration obeys the time limit
+        state = self.state
+        root_undo = len(state.undo)
+        start = time.perf_counter()
+        best_move, best, self.depth_reached = known or (None, -INFINITY, 0)
+        start_depth = max(start_depth, self.depth_reached + 1)
+        for depth in range(start_depth, max_depth + 1):
+            if time_limit is not None and (depth > start_depth or best_move is not None):
+                self.deadline = start + time_limit
+            try:
+                if self.aspiration is not None and best_move is not None:
+                    move, score = self._aspiration_search(depth, best_move, best)
+                else:
+                    move, score = self.search(depth, best_move)
+            except SearchTimeout:
+                #takes back the moves of the abandoned iteration
+                while len(state.undo) > root_undo:
+                    state.unmake()
+                break
+            finally:
+                self.deadline = None
+            best_move, best, self.depth_reached = move, score, depth
+            if self.immediate_goal or abs(score) == INFINITY:
+                #a decided position gets no deeper by searching further
+                break
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+        return best_move, best, self.depth_reached
+
+    def _aspiration_search(self, depth, first_move, guess):
+        # search(depth) in a window around guess, searched again with a wider window on failure.
+        # A won or lost root (an infinite score) is final: no window can contain it, so
+        # it is returned as soon as it is seen instead of widening forever. Every
+        # re-search looks at the clock first, as table cutoffs may leave _negamax
+        # too few nodes to poll it.
+        delta = self.aspiration
+        alpha, beta = guess - delta, guess + delta
+        while True:
+            move, score = self.search(depth, first_move, alpha, beta)
+            if alpha < score < beta or self.immediate_goal or abs(score) == INFINITY:
+                return move, score
+            if (score <= alpha and alpha == -INFINITY) or (score >= beta and beta == INFINITY):
+                return move, score
+            self._check_clock()
+            self.aspiration_researches += 1
+            delta *= 4
+            if score <= alpha:
+                alpha = score - delta if delta <= ASPIRATION_MAX else -INFINITY
+            else:
+                beta = score + delta if delta <= ASPIRATION_MAX else INFINITY
+                first_move = move
+
+    def _check_clock(self):
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop is not None and self.stop():
+            raise SearchTimeout()
+
+    def search(self, depth, first_move=None, alpha=-INFINITY, beta=INFINITY):
+        # Returns (best move, score) for the root's side to move. A score at or
+        # below alpha or at or above beta is only a bound (aspiration windows).
+        state, tt = self.state, self.tt
+        hash_move = first_move
+        if tt is not None:
+            tt.new_search()
+            entry = tt.probe(state.key)
+            if entry is not None and hash_move is None:
+                hash_move = entry[3]
+
+        best_move, best = None, -INFINITY
+        alpha_orig = alpha
+        for move in self.ordered_moves(state, hash_move):
+            if self.is_immediate_goal(move):
+                #takes an immediate goal, like the agents' root loops
+                self.nodes += 1
+                self.immediate_goal = True
+                state.make(move)
+                score = -self._leaf(state)
+                state.unmake()
+                return move, score
+            if self.pvs and best_move is not None and self.prune:
+                score = self.search_move(move, depth, alpha, null_window(alpha))
+                if alpha < score < beta:
+                    self.researches += 1
+                    score = self.search_move(move, depth, alpha, beta)
+            else:
+                score = self.search_move(move, depth, alpha, beta)
+            if score > best or best_move is None:
+                best_move, best = move, score
+                if self.prune:
+                    alpha = max(alpha, best)
+                    if alpha >= beta:
+                        break
+        if tt is not None and best_move is not None:
+            bound = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+            tt.store(state.key, depth, bound, best, best_move)
+        return best_move, best
+
+    def is_immediate_goal(self, move):
+        state = self.state
+        state.make(move)
+        won = state.winner
+        state.unmake()
+        return bool(won)
+
+    def search_move(self, move, depth, alpha=-INFINITY, beta=INFINITY):
+        # Score of one root move searched to depth with the window (alpha, beta).
+        # A score inside the window is exact; anything else only bounds the move.
+        self.nodes += 1
+        self._root_depth = depth
+        self.state.make(move)
+        score = -self._negamax(depth - 1, -beta, -alpha)
+        self.state.unmake()
+        return score
+
+    def _negamax(self, depth, alpha, beta, ply=1):
+        state, tt = self.state, self.tt
+        if self.tablebase is not None and not state.winner:
+            plies = self.tablebase.probe(state)
+            if plies is not None:
+                self.tablebase_hits += 1
+                return RACE_SCORE - plies if plies % 2 else plies - RACE_SCORE
+        if depth <= 0 and self.quiescence and not state.winner:
+            self._budget = self.quiescence_limit
+            return self._quiesce(alpha, beta)
+        if depth <= 0 or state.winner:
+            return self._leaf(state)
+
+        hash_move = None
+        if tt is not None:
+            entry = tt.probe(state.key)
+            if entry is not None:
+                entry_depth, bound, score, hash_move = entry
+                if entry_depth >= depth:
+                    if bound == EXACT:
+                        return score
+                    if bound == LOWER and score >= beta:
+                        return score
+                    if bound == UPPER and score <= alpha:
+                        return score
+        alpha_orig = alpha
+
+        # quiet moves may be reduced or pruned unless the opponent is close to its goal
+        selective = (self.lmr or self.futility) and self.prune
+        if selective:
+            near_goal = state.geo.near_goal
+            enemy = state.white if state.turn == 1 else state.black
+            selective = not enemy & near_goal[3 - state.turn]
+        futile = None
+        if selective and self.futility and depth == 1:
+            futile = self._leaf(state) + self.futility_margin
+            if futile > alpha:
+                futile = None
+        reduce = selective and self.lmr and depth >= LMR_DEPTH
+        #a move onto the row before the goal threatens to win: its line is searched a ply deeper
+        extend = self.threats and ply + depth < self._root_depth + MAX_EXTENSIONS
+        pregoal = state.geo.pregoal_rows[state.turn]
+
+        best, best_move = -INFINITY, None
+        for index, move in enumerate(self.ordered_moves(state, hash_move, ply)):
+            quiet = (selective and not enemy >> (move & TO_MASK) & 1
+                     and not near_goal[state.turn] >> (move >> MOVE_SHIFT) & 1)
+            if quiet and futile is not None:
+                #this move cannot lift the score above alpha; futile bounds it from above
+                self.futility_prunes += 1
+                if futile > best:
+                    best = futile
+                continue
+            self.nodes += 1
+            if (self.deadline is not None or self.stop is not None) and not self.nodes % CLOCK_INTERVAL:
+                self._check_clock()
+            state.make(move)
+            if extend and pregoal >> (move & TO_MASK) & 1:
+                self.extensions += 1
+                score = self._search_child(depth + 1, alpha, beta, ply, index)
+            elif quiet and reduce and index >= LMR_MOVES:
+                self.reductions += 1
+                score = -self._negamax(depth - 2, -null_window(alpha), -alpha, ply + 1)
+                if score > alpha:
+                    self.reduction_researches += 1
+                    score = self._search_child(depth, alpha, beta, ply, index)
+            else:
+                score = self._search_child(depth, alpha, beta, ply, index)
+            state.unmake()
+            if score > best:
+                best, best_move = score, move
+                if best > alpha and self.prune:
+                    alpha = best
+                    if alpha >= beta:
+                        self._record_cutoff(state, move, depth, ply, index)
+                        break
+
+        if tt is not None:
+            bound = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+            tt.store(state.key, depth, bound, best, best_move)
+        return best
+
+    def _search_child(self, depth, alpha, beta, ply, index):
+        #score of the move just made, with a null window first under PVS
+        if self.pvs and index and self.prune:
+            score = -self._negamax(depth - 1, -null_window(alpha), -alpha, ply + 1)
+            if alpha < score < beta:
+                self.researches += 1
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            return score
+        return -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+
+    def _quiesce(self, alpha, beta):
+        # Stand pat: the side to move may stop at the static score, so only
+        # tactical moves that beat it are searched, best exchange first.
+        # When the node budget runs out the remaining leaves are scored statically.
+        state = self.state
+        best = self._leaf(state)
+        if state.winner or best >= beta or self._budget <= 0:
+            return best
+        if best > alpha:
+            alpha = best
+        for move in state.tactical_moves():
+            if self._budget <= 0:
+                break
+            self._budget -= 1
+            self.nodes += 1
+            self.quiescence_nodes += 1
+            if (self.deadline is not None or self.stop is not None) and not self.nodes % CLOCK_INTERVAL:
+                self._check_clock()
+            state.make(move)
+            score = -self._quiesce(-beta, -alpha)
+            state.unmake()
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        return best
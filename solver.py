@@ -0,0 +1,231 @@
+#Depth-first proof-number search (df-pn): proves positions won or lost.
+#
+# Alpha-beta at a fixed depth only scores a position; df-pn decides it. Every
+# node has a proof number (how many leaves still have to be won to show the
+# side to move wins) and a disproof number (the same for a loss). The search
+# keeps descending into the child that is cheapest to decide, within
+# thresholds, until the root's proof or disproof number reaches zero.
+# A node's numbers are, in negamax form:
+#   proof = min(disproof of the children), disproof = sum(proof of the children)
+#
+# Moves only go forward, so positions never repeat and transpositions can share
+# one entry without the graph-history problems df-pn has in other games.
+# Children already decided by the game (a goal move, a capture of the last
+# piece), by BitboardState.race_result() or by an endgame tablebase are proven
+# without being searched.
+#
+# The numbers live in a fixed-size table like TranspositionTable, so memory
+# stays bounded; an entry that loses its slot is simply searched again. When
+# the table is too small for the proof, colliding entries can keep evicting
+# each other and the search would never finish, so it always has a node budget
+# (MAX_NODES unless another one is given).
+
+import time
+
+# results, from the side to move's point of view
+WIN, LOSS, UNKNOWN = 1, -1, 0
+
+#proof and disproof numbers at or above this are infinite
+INFINITE = 1 << 40
+
+#how many nodes are searched between two looks at the clock
+CLOCK_INTERVAL = 1024
+
+# rough size of one stored entry (slot + tuple + ints) used to turn a memory cap into a slot count
+ENTRY_BYTES = 110
+
+# the most plies returned as the proof line
+MAX_LINE = 256
+
+# the agents' solver mode: tried first when at most SOLVER_PIECES pieces are
+# left on the board, giving up after SOLVER_NODES nodes
+SOLVER_PIECES = 8
+SOLVER_NODES = 20000
+
+#node budget of a solve given no max_nodes
+MAX_NODES = 1000000
+
+
+class SolverLimit(Exception):
+    #raised inside the solver when its node or time limit is reached
+    pass
+
+
+class ProofTable:
+    # Fixed-size table of (proof, disproof) numbers indexed by the low bits of the
+    # Zobrist key. The newest entry always takes the slot: a parent reads its
+    # child's numbers right after searching it, and a child whose store was
+    # refused would look unsearched and be chosen again forever.
+
+    def __init__(self, size=1 << 18, max_memory_mb=None):
+        if max_memory_mb is not None:
+            size = min(size, int(max_memory_mb * 1024 * 1024) // ENTRY_BYTES)
+        size = 1 << max(0, size.bit_length() - 1)
+        self.size = size
+        self.mask = size - 1
+        self.slots = [None] * size
+        self.stores = 0
+        self.overwrites = 0
+
+    def lookup(self, key):
+        #(proof, disproof) of key, 1 and 1 for a position never searched
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry[1], entry[2]
+        return 1, 1
+
+    def store(self, key, proof, disproof):
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is not None and entry[0] != key:
+            self.overwrites += 1
+        self.stores += 1
+        self.slots[index] = (key, proof, disproof)
+
+    def used_slots(self):
+        return sum(1 for entry in self.slots if entry is not None)
+
+
+class ProofNumberSearch:
+
+    def __init__(self, state, table=None, max_nodes=MAX_NODES, time_limit=None, tablebase=None, races=True):
+        # state (BitboardState): position to solve, modified in place and restored
+        # table (ProofTable): node table, a new one by default; keep it to reuse work
+        # max_nodes (int), time_limit (float): the solver gives up (UNKNOWN) past either;
+        #   max_nodes None means MAX_NODES, so every solve ends
+        # tablebase (Tablebase): decides the positions it holds; ignored when made for
+        #   another board or rules
+        # races (bool): positions race_result() decides count as proven
+        self.state = state
+        self.table = table if table is not None else ProofTable()
+        self.max_nodes = MAX_NODES if max_nodes is None else max_nodes
+        self.time_limit = time_limit
+        self.deadline = None
+        self.tablebase = tablebase if tablebase is not None and tablebase.covers(state) else None
+        self.races = races
+        self.nodes = 0
+        self.decided = 0 #children proven by the game, a race or the tablebase
+
+    def solve(self):
+        # Returns (result, line): WIN or LOSS for the side to move with the moves
+        # (encoded ints) of a line proving it, or (UNKNOWN, []) when a limit was reached.
+        state = self.state
+        if state.winner:
+            return (WIN if state.winner == state.turn else LOSS), []
+        root_undo = len(state.undo)
+        self.deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        try:
+            self._mid(state.key, INFINITE, INFINITE)
+        except SolverLimit:
+            #takes back the moves of the abandoned search
+            while len(state.undo) > root_undo:
+                state.unmake()
+            return UNKNOWN, []
+        finally:
+            self.deadline = None
+        proof, disproof = self.table.lookup(state.key)
+        if proof == 0:
+            return WIN, self.proof_line()
+        if disproof == 0:
+            return LOSS, self.proof_line()
+        return UNKNOWN, []
+
+    def stats(self):
+        return {'nodes': self.nodes, 'decided': self.decided, 'table_size': self.table.size,
+                'table_used': self.table.used_slots(), 'table_stores': self.table.stores,
+                'table_overwrites': self.table.overwrites}
+
+    def _children(self):
+        # [move, key, fixed] per move of the side to move; fixed is the child's
+        # (proof, disproof) when it is decided without search, else None
+        state = self.state
+        children = []
+        for move in state.generate_moves():
+            state.make(move)
+            fixed = None
+            if state.winner:
+                #the move won: the child's side to move has lost
+                fixed = (INFINITE, 0)
+            elif self.tablebase is not None:
+                plies = self.tablebase.probe(state)
+                if plies is not None:
+                    fixed = (0, INFINITE) if plies % 2 else (INFINITE, 0)
+            if fixed is None and self.races:
+                race = state.race_result()
+                if race:
+                    fixed = (0, INFINITE) if race > 0 else (INFINITE, 0)
+            if fixed is not None:
+                self.decided += 1
+            children.append((move, state.key, fixed))
+            state.unmake()
+        return children
+
+    def _mid(self, key, proof_threshold, disproof_threshold):
+        #searches the current position until its numbers reach a threshold, then stores them
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SolverLimit()
+        if self.deadline is not None and not self.nodes % CLOCK_INTERVAL and time.perf_counter() >= self.deadline:
+            raise SolverLimit()
+        table, state = self.table, self.state
+        children = self._children()
+        if not children:
+            #no move: the side to move loses, as in AlphaBetaSearch
+            table.store(key, INFINITE, 0)
+            return
+        while True:
+            proof, disproof = INFINITE, 0
+            best = best_proof = None
+            second = INFINITE
+            for index, (_, child_key, fixed) in enumerate(children):
+                child_proof, child_disproof = fixed or table.lookup(child_key)
+                disproof = min(INFINITE, disproof + child_proof)
+                if child_disproof < proof:
+                    second = proof
+                    proof, best, best_proof = child_disproof, index, child_proof
+                elif child_disproof < second:
+                    second = child_disproof
+            if proof >= proof_threshold or disproof >= disproof_threshold or not proof or not disproof:
+                break
+            move, child_key, _ = children[best]
+            state.make(move)
+            self._mid(child_key, min(INFINITE, disproof_threshold - disproof + best_proof),
+                      min(proof_threshold, second + 1))
+            state.unmake()
+        table.store(key, proof, disproof)
+
+    def proof_line(self):
+        # The moves from the root of a line the proof holds: the winner's moves
+        # keep the position won, the loser's are any reply (all lose). Stops at a
+        # child decided without search or one the table no longer holds.
+        state, table = self.state, self.table
+        line = []
+        made = 0
+        while len(line) < MAX_LINE:
+            proof, disproof = table.lookup(state.key)
+            if proof and disproof:
+                break
+            winning = proof == 0
+            chosen = fixed_chosen = None
+            for move, child_key, fixed in self._children():
+                child_proof, child_disproof = fixed or table.lookup(child_key)
+                if winning and child_disproof == 0 or not winning and child_proof == 0:
+                    chosen, fixed_chosen = move, fixed
+                    if fixed is not None:
+                        #a decided child ends the line at once, so it is preferred
+                        break
+            if chosen is None:
+                break
+            line.append(chosen)
+            if fixed_chosen is not None:
+                break
+            state.make(chosen)
+            made += 1
+        for _ in range(made):
+            state.unmake()
+        return line
+
+
+def solve(state, max_nodes=MAX_NODES, time_limit=None, tablebase=None, table=None):
+    #(result, line) of ProofNumberSearch(state, ...).solve()
+    return ProofNumberSearch(state, table, max_nodes, time_limit, tablebase).solve()
@@ -0,0 +1,315 @@
+#Endgame tablebases: every position with up to K pieces per side, solved offline.
+#
+# Every Breakthrough move takes a piece one row forward, so a position can never
+# come back and every game ends. Retrograde analysis can therefore solve the
+# positions of a material signature (black pieces, white pieces) in order of
+# how many rows the pieces still have to go: a move leads to a position with
+# fewer rows to go, or with fewer pieces (a signature solved before), so its
+# value is always known by the time it is needed.
+#
+# A position's entry is one byte: 0 when the table does not cover it (squares
+# shared by both sides, a game already over for the side not to move), else
+# 1 + the plies to the end of the game when the winner hurries and the loser
+# delays. The side to move wins when that number of plies is odd.
+# A side without a move loses, as in AlphaBetaSearch.
+#
+#   python tablebase.py --board 0 --pieces 2                # 8x8, State rules (captures)
+#   python tablebase.py --board 1 --pieces 2 --no-captures  # 5x10, GameState rules
+#
+# Tables are written to TABLEBASE_DIR and read through mmap, so every process
+# probing the same file shares one copy of it in the page cache.
+
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from itertools import combinations
+
+from bitboard import BOARD_SIZES
+
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebases')
+
+# file layout: header, one section record per signature, then the sections.
+# A section holds an entry per (black set, white set, side to move), at
+# (black rank * white sets + white rank) * 2 + side - 1, ranks being the
+# sets' colex ranks (sum of comb(square, i + 1) over the sorted squares).
+MAGIC = b'BTTB'
+VERSION = 1
+_HEADER = struct.Struct('<4sBBBBBB')       # magic, version, height, width, captures, max pieces, sections
+_SECTION = struct.Struct('<BBQQ')          # black pieces, white pieces, offset, length
+
+
+def tablebase_path(height, width, captures, max_pieces, directory=TABLEBASE_DIR):
+    rules = 'captures' if captures else 'nocaptures'
+    return os.path.join(directory, 'breakthrough-%dx%d-%s-k%d.tb' % (height, width, rules, max_pieces))
+
+
+def signatures(max_pieces):
+    #(black, white) piece counts, fewest pieces first so captures lead to solved signatures
+    return sorted(((b, w) for b in range(1, max_pieces + 1) for w in range(1, max_pieces + 1)),
+                  key=lambda signature: (sum(signature), signature))
+
+
+class _Generator:
+    # solves every signature of one board and rule set, keeping the solved
+    # sections in memory for the captures into them
+
+    def __init__(self, height, width, captures):
+        self.height = height
+        self.width = width
+        self.captures = captures
+        squares = height * width
+        # per side and square: (forward, diagonal...) targets; pieces on their goal row have none
+        self.targets = {1: [], 2: []}
+        for s in range(squares):
+            row, col = divmod(s, width)
+            for side, step in ((1, width), (2, -width)):
+                if not 0 <= row + step // width < height:
+                    self.targets[side].append(((), ()))
+                    continue
+                diagonals = tuple(s + step + d for d in (-1, 1) if 0 <= col + d < width)
+                self.targets[side].append(((s + step,), diagonals))
+        self.goal_rows = {1: ((1 << width) - 1) << ((height - 1) * width), 2: (1 << width) - 1}
+        self.sets = {}        # pieces -> masks in rank order
+        self.ranks = {}       # pieces -> {mask: rank}
+        self.sections = {}    # signature -> bytearray
+
+    def _sets(self, pieces):
+        if pieces not in self.sets:
+            masks = [sum(1 << s for s in combo) for combo in combinations(range(self.height * self.width), pieces)]
+            masks.sort(key=lambda mask: _colex_rank(mask))
+            self.sets[pieces] = masks
+            self.ranks[pieces] = {mask: rank for rank, mask in enumerate(masks)}
+        return self.sets[pieces]
+
+    def _rows_to_go(self, mask, side):
+        rows = [s // self.width for s in _bits(mask)]
+        return sum(self.height - 1 - row for row in rows) if side == 1 else sum(rows)
+
+    def solve(self, signature):
+        nb, nw = signature
+        blacks, whites = self._sets(nb), self._sets(nw)
+        section = bytearray(len(blacks) * len(whites) * 2)
+        self.sections[signature] = section
+        # positions grouped by rows to go, solved fewest first
+        by_black, by_white = {}, {}
+        for rank, mask in enumerate(blacks):
+            by_black.setdefault(self._rows_to_go(mask, 1), []).append((rank, mask))
+        for rank, mask in enumerate(whites):
+            by_white.setdefault(self._rows_to_go(mask, 2), []).append((rank, mask))
+        whites_count = len(whites)
+        for total in range(max(by_black) + max(by_white) + 1):
+            for black_rows, black_group in by_black.items():
+                white_group = by_white.get(total - black_rows)
+                if not white_group:
+                    continue
+                for black_rank, black in black_group:
+                    base = black_rank * whites_count
+                    for white_rank, white in white_group:
+                        if black & white:
+                            continue
+                        index = (base + white_rank) << 1
+                        section[index] = self._entry(black, white, 1)
+                        section[index | 1] = self._entry(black, white, 2)
+        return section
+
+    def _entry(self, black, white, turn):
+        #the byte of one position (see the module comment)
+        black_home, white_home = black & self.goal_rows[1], white & self.goal_rows[2]
+        if black_home or white_home:
+            #the side not to move has just won; anything else cannot come up in a game
+            won = 1 if black_home else 2
+            return 1 if won != turn and not (black_home and white_home) else 0
+        own, enemy = (black, white) if turn == 1 else (white, black)
+        best_win = best_loss = None
+        for frm, to, capture in self._moves(own, enemy, turn):
+            plies = self._after(own, enemy, frm, to, turn, capture)
+            if plies % 2:
+                #the opponent wins from there
+                if best_loss is None or plies > best_loss:
+                    best_loss = plies
+            elif best_win is None or plies < best_win:
+                if not plies:
+                    #a move that ends the game cannot be bettered
+                    return 2
+                best_win = plies
+        if best_win is not None:
+            return best_win + 2
+        return 1 if best_loss is None else best_loss + 2
+
+    def _moves(self, own, enemy, turn):
+        #(from, to, capture) of every move of the side to move
+        targets, occupied = self.targets[turn], own | enemy
+        for frm in _bits(own):
+            forward, diagonals = targets[frm]
+            for to in forward:
+                if not occupied >> to & 1:
+                    yield frm, to, False
+            for to in diagonals:
+                if enemy >> to & 1:
+                    if self.captures:
+                        yield frm, to, True
+                elif not own >> to & 1:
+                    yield frm, to, False
+
+    def _after(self, own, enemy, frm, to, turn, capture):
+        #plies to the end after the move, for the opponent then to move
+        bit = 1 << to
+        if bit & self.goal_rows[turn]:
+            return 0
+        own ^= (1 << frm) | bit
+        if capture:
+            enemy ^= bit
+            if not enemy:
+                return 0
+        black, white = (own, enemy) if turn == 1 else (enemy, own)
+        nb, nw = black.bit_count(), white.bit_count()
+        index = (self.ranks[nb][black] * len(self.sets[nw]) + self.ranks[nw][white]) << 1 | (2 - turn)
+        return self.sections[(nb, nw)][index] - 1
+
+
+def generate(height, width, captures=True, max_pieces=2, path=None, progress=None):
+    # Solves every signature with 1 to max_pieces pieces per side and writes the
+    # tables to path (tablebase_path() by default); returns the path.
+    # progress (callable): progress(signature, seconds) after each signature
+    generator = _Generator(height, width, captures)
+    order = signatures(max_pieces)
+    for signature in order:
+        start = time.perf_counter()
+        generator.solve(signature)
+        if progress is not None:
+            progress(signature, time.perf_counter() - start)
+    path = path or tablebase_path(height, width, captures, max_pieces)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    offset = _HEADER.size + _SECTION.size * len(order)
+    records = []
+    for signature in order:
+        records.append(_SECTION.pack(signature[0], signature[1], offset, len(generator.sections[signature])))
+        offset += len(generator.sections[signature])
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, height, width, int(captures), max_pieces, len(order)))
+        f.write(b''.join(records))
+        for signature in order:
+            f.write(generator.sections[signature])
+    return path
+
+
+class Tablebase:
+    # Read-only view of a generated file. The entries stay in the mapped file,
+    # so the processes of a parallel search share them instead of each loading a copy.
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.height, self.width, captures, self.max_pieces, count = \
+            _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError("%s is not a version %d tablebase" % (path, VERSION))
+        self.captures = bool(captures)
+        squares = self.height * self.width
+        #signature -> (offset, number of white sets)
+        self.sections = {}
+        for i in range(count):
+            nb, nw, offset, _ = _SECTION.unpack_from(self.data, _HEADER.size + i * _SECTION.size)
+            self.sections[(nb, nw)] = (offset, math.comb(squares, nw))
+        self.binomials = [[math.comb(s, k) for k in range(self.max_pieces + 1)] for s in range(squares)]
+        self.reset_stats()
+
+    def __reduce__(self):
+        #pickles as the path: the receiving process maps the same file
+        return (open_tablebase, (self.path,))
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+
+    def covers(self, state):
+        #whether the table was generated for the state's board size and rules
+        return (state.height, state.width, state.captures) == (self.height, self.width, self.captures)
+
+    def _rank(self, mask):
+        binomials, rank, k = self.binomials, 0, 1
+        while mask:
+            low = mask & -mask
+            rank += binomials[low.bit_length() - 1][k]
+            mask ^= low
+            k += 1
+        return rank
+
+    def probe(self, state):
+        # plies to the end of the game from state with best play (the side to
+        # move wins when odd), or None when the table does not hold the position
+        section = self.sections.get((state.black_num, state.white_num))
+        if section is None:
+            return None
+        self.probes += 1
+        offset, whites = section
+        value = self.data[offset + ((self._rank(state.black) * whites + self._rank(state.white)) << 1)
+                          + state.turn - 1]
+        if not value:
+            return None
+        self.hits += 1
+        return value - 1
+
+    def stats(self):
+        return {'probes': self.probes, 'hits': self.hits, 'max_pieces': self.max_pieces,
+                'bytes': len(self.data)}
+
+    def close(self):
+        self.data.close()
+
+
+_opened = {}
+
+
+def open_tablebase(path):
+    #the process's mapping of a tablebase file, made once per path
+    if path not in _opened:
+        _opened[path] = Tablebase(path)
+    return _opened[path]
+
+
+def find_tablebase(height, width, captures, directory=TABLEBASE_DIR):
+    #the generated table with the most pieces for a board and rule set, or None
+    for max_pieces in range(8, 0, -1):
+        path = tablebase_path(height, width, captures, max_pieces, directory)
+        if os.path.exists(path):
+            return open_tablebase(path)
+    return None
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _colex_rank(mask):
+    return sum(math.comb(s, k) for k, s in enumerate(_bits(mask), 1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a Breakthrough endgame tablebase.")
+    parser.add_argument('--board', type=int, choices=sorted(BOARD_SIZES), default=0,
+                        help="board layout: 0 = 8x8, 1 = 5x10")
+    parser.add_argument('--pieces', type=int, default=2, help="most pieces per side (default 2)")
+    parser.add_argument('--no-captures', action='store_true',
+                        help="GameState rules: diagonal moves onto empty squares only")
+    parser.add_argument('--output', help="file to write (default under %s)" % TABLEBASE_DIR)
+    args = parser.parse_args(argv)
+    height, width = BOARD_SIZES[args.board]
+    start = time.perf_counter()
+    path = generate(height, width, not args.no_captures, args.pieces, args.output,
+                    progress=lambda signature, seconds: print("  %d v %d solved in %.1fs" % (signature + (seconds,))))
+    print("wrote %s (%d bytes) in %.1fs" % (path, os.path.getsize(path), time.perf_counter() - start))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#Regression tests of the compiled heuristics (evaluation.py): python -m pytest test_evaluation.py
+#
+# The heuristics are checked against the formulas State and GameState used
+# before they were compiled to piece-square tables, on positions of random
+# games, for the list states and their bitboard replacements alike. The same
+# games check the bitboards' coordination links and the NumPy batch
+# coordination against PositionEvaluator.evaluate_piece_coordination.
+
+import random
+
+import pytest
+
+from bitboard import BOARD_SIZES, BitboardGameState, BitboardState
+from engine import State
+from evaluation import STATE_HEURISTICS, tie_break
+from minimax_agent import GameState, PositionEvaluator
+
+GAMES = 6
+
+
+def initial_board(height, width):
+    #two rows of black pieces at the top, two of white at the bottom
+    return [[1 if row < 2 else 2 if row >= height - 2 else 0 for _ in range(width)] for row in range(height)]
+
+
+def random_positions(make_state, board_type, seed):
+    # every position (a state, made by make_state(matrix, turn, width, height)) of
+    # GAMES random games on the board type, each with its own rules
+    height, width = BOARD_SIZES[board_type]
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(GAMES):
+        state = make_state(initial_board(height, width), 1, width, height)
+        while True:
+            positions.append(state)
+            actions = state.available_actions()
+            if state.isgoalstate() or not actions:
+                break
+            state = state.transfer(rng.choice(actions))
+    return positions
+
+
+def pieces(state):
+    #(black, white) lists of (row, col)
+    matrix = state.getMatrix()
+    black = [(i, j) for i, row in enumerate(matrix) for j, piece in enumerate(row) if piece == 1]
+    white = [(i, j) for i, row in enumerate(matrix) for j, piece in enumerate(row) if piece == 2]
+    return black, white
+
+
+def side_score(positions, turn, white_home):
+    #the original score: pieces plus rows advanced, white counting from white_home
+    return len(positions) + sum(row if turn == 1 else white_home - row for row, _ in positions)
+
+
+# the heuristics as State wrote them, without their random.random() / 10 tie-break
+STATE_FORMULAS = {
+    1: lambda mine, theirs: 2 * (30 - theirs),           # offensiveHeuristic1
+    2: lambda mine, theirs: 2 * mine,                    # defensiveHeuristic1
+    3: lambda mine, theirs: 1 * mine - 2 * theirs,       # offensiveHeuristic2
+    4: lambda mine, theirs: 2 * mine - 2 * theirs,       # defensiveHeuristic2
+}
+STATE_METHODS = {1: 'offensiveHeuristic1', 2: 'defensiveHeuristic1', 3: 'offensiveHeuristic2',
+                 4: 'defensiveHeuristic2'}
+
+# GameState's offensive_function and defensive_function
+GAME_STATE_FORMULAS = {
+    1: lambda mine, theirs: 2 * mine - theirs,
+    2: lambda mine, theirs: mine - 2 * theirs,
+}
+GAME_STATE_METHODS = {1: 'offensive_function', 2: 'defensive_function'}
+
+
+def make_list_state(matrix, turn, width, height):
+    return State(BoardRepresentation=matrix, turn=turn, width=width, height=height)
+
+
+def make_bitboard_state(matrix, turn, width, height):
+    return BitboardState.from_matrix(matrix, turn, 0, width, height)
+
+
+def make_game_state(matrix, turn, width, height):
+    return GameState(board_config=matrix, player=turn, width=width, height=height)
+
+
+def make_bitboard_game_state(matrix, turn, width, height):
+    return BitboardGameState.from_matrix(matrix, turn, 0, width, height)
+
+
+def key_of(state):
+    return state.key() if callable(state.key) else state.key
+
+
+@pytest.mark.parametrize('board_type', sorted(BOARD_SIZES))
+@pytest.mark.parametrize('make_state', [make_list_state, make_bitboard_state], ids=['State', 'BitboardState'])
+def test_state_heuristics_match_formulas(make_state, board_type):
+    for state in random_positions(make_state, board_type, seed=board_type):
+        black, white = pieces(state)
+        for turn in (1, 2):
+            scores = {1: side_score(black, 1, 7), 2: side_score(white, 2, 7)}
+            mine, theirs = scores[turn], scores[3 - turn]
+            for function, formula in STATE_FORMULAS.items():
+                tiebreak = tie_break(key_of(state)) if STATE_HEURISTICS[function].tiebreak else 0
+                state.function = function
+                if isinstance(state, BitboardState):
+                    state.heuristic = state.heuristics[function]
+                assert state.utility(turn) - tiebreak == pytest.approx(formula(mine, theirs))
+                assert getattr(state, STATE_METHODS[function])(turn) - tiebreak == pytest.approx(formula(mine, theirs))
+
+
+@pytest.mark.parametrize('board_type', sorted(BOARD_SIZES))
+@pytest.mark.parametrize('make_state', [make_game_state, make_bitboard_game_state],
+                         ids=['GameState', 'BitboardGameState'])
+def test_game_state_heuristics_match_formulas(make_state, board_type):
+    height = BOARD_SIZES[board_type][0]
+    for state in random_positions(make_state, board_type, seed=10 + board_type):
+        black, white = pieces(state)
+        for turn in (1, 2):
+            scores = {1: side_score(black, 1, height - 1), 2: side_score(white, 2, height - 1)}
+            mine, theirs = scores[turn], scores[3 - turn]
+            for function, formula in GAME_STATE_FORMULAS.items():
+                if isinstance(state, BitboardGameState):
+                    state.function = function
+                    state.heuristic = state.heuristics[function]
+                else:
+                    state.eval_func = function
+                assert state.utility(turn) == formula(mine, theirs)
+                assert getattr(state, GAME_STATE_METHODS[function])(turn) == formula(mine, theirs)
+
+
+@pytest.mark.parametrize('board_type', sorted(BOARD_SIZES))
+def test_tie_break_is_deterministic_and_bounded(board_type):
+    height, width = BOARD_SIZES[board_type]
+    for state in random_positions(make_list_state, board_type, seed=20 + board_type):
+        matrix = state.getMatrix()
+        bitboard = BitboardState.from_matrix(matrix, state.turn, 0, width, height)
+        assert key_of(state) == bitboard.key
+        value = tie_break(bitboard.key)
+        assert 0 <= value < 0.1
+        assert tie_break(bitboard.key) == value
+        for function in (1, 2):
+            #the same position scores the same however often and on whichever state it is evaluated
+            state.function = function
+            again = BitboardState.from_matrix(matrix, state.turn, function, width, height)
+            assert state.utility(1) == state.utility(1) == again.utility(1)
+
+
+@pytest.mark.parametrize('cls, function', [(BitboardState, 5), (BitboardGameState, 3)])
+def test_unknown_heuristic_is_refused(cls, function):
+    #a heuristic the rule set does not have used to fall back silently to no heuristic (every score 0)
+    with pytest.raises(ValueError):
+        cls.from_matrix(initial_board(8, 8), 1, function)
+
+
+class TrackedBitboardState(BitboardState):
+    #State rules (with captures) keeping the links move by move, so captures update them too
+    track_links = True
+
+
+def coordination(positions):
+    return PositionEvaluator.evaluate_piece_coordination(positions)
+
+
+@pytest.mark.parametrize('board_type', sorted(BOARD_SIZES))
+@pytest.mark.parametrize('cls', [BitboardGameState, TrackedBitboardState, BitboardState],
+                         ids=['BitboardGameState', 'tracked BitboardState', 'BitboardState'])
+def test_links_match_piece_coordination(cls, board_type):
+    # the incremental links along random games of make() calls, and again while
+    # they are taken back by unmake(), equal the scalar evaluate_piece_coordination
+    height, width = BOARD_SIZES[board_type]
+    rng = random.Random(30 + board_type)
+    for _ in range(GAMES):
+        state = cls.from_matrix(initial_board(height, width), 1, 0, width, height)
+        made = 0
+        while True:
+            black, white = pieces(state)
+            assert state.coordination(1) == coordination(black)
+            assert state.coordination(2) == coordination(white)
+            moves = state.generate_moves()
+            if state.winner or not moves:
+                break
+            state.make(rng.choice(moves))
+            made += 1
+        for _ in range(made):
+            state.unmake()
+            black, white = pieces(state)
+            assert state.coordination(1) == coordination(black)
+            assert state.coordination(2) == coordination(white)
+
+
+@pytest.mark.parametrize('board_type', sorted(BOARD_SIZES))
+def test_batch_piece_coordination_matches_scalar(board_type):
+    positions = random_positions(make_bitboard_game_state, board_type, seed=40 + board_type)
+    positions += random_positions(make_bitboard_state, board_type, seed=50 + board_type)
+    boards = [state.getMatrix() for state in positions]
+    for player in (1, 2):
+        batch = PositionEvaluator.batch_piece_coordination(boards, player)
+        expected = [coordination(pieces(state)[player - 1]) for state in positions]
+        assert list(batch) == expected
@@ -0,0 +1,59 @@
+#Tests of the in-place search's time control: python -m pytest test_search.py
+
+import threading
+import time
+
+import pytest
+
+from alpha_beta_agent import ImprovedSearchAgent
+from engine import AlphaBetaAgent
+from transposition import TranspositionTable
+
+TIME_LIMIT = 1.0
+
+
+def decided_board():
+    # White's runner on row 1 reaches its goal next move and no black piece can
+    # stop it: a forced loss for black to move, a forced win for white
+    board = [[0] * 8 for _ in range(8)]
+    board[0][0] = 1
+    board[5][3] = 1
+    board[1][7] = 2
+    board[6][2] = 2
+    return board
+
+
+def timed(move):
+    #seconds the move took, failing when it does not finish well past the time limit
+    result = {}
+
+    def run():
+        start = time.perf_counter()
+        move()
+        result['seconds'] = time.perf_counter() - start
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(TIME_LIMIT * 5)
+    assert not thread.is_alive(), "the search did not return"
+    return result['seconds']
+
+
+@pytest.mark.parametrize('player', [1, 2])
+def test_improved_agent_decided_root_returns(player):
+    agent = ImprovedSearchAgent(decided_board(), player, 8, 3, tt=TranspositionTable(), pvs=True,
+                                time_limit=TIME_LIMIT)
+    assert timed(agent.get_best_move) < TIME_LIMIT
+
+
+@pytest.mark.parametrize('player', [1, 2])
+def test_alpha_beta_agent_decided_root_returns(player):
+    agent = AlphaBetaAgent(decided_board(), player, 8, 3, tt=TranspositionTable(), pvs=True, threats=True,
+                           time_limit=TIME_LIMIT)
+    assert timed(agent.alpha_beta_decision) < TIME_LIMIT
+
+
+def test_ponder_decided_root_stops():
+    board = decided_board()
+    agent = AlphaBetaAgent(board, 1, 8, 3, tt=TranspositionTable(), pvs=True, threats=True)
+    assert timed(lambda: agent.ponder(board, lambda: False)) < TIME_LIMIT
@@ -0,0 +1,35 @@
+#Tests of the tournament's sequential probability ratio test: python -m pytest test_tournament.py
+
+import pytest
+
+from tournament import sprt_bounds, sprt_llr
+
+ELO0, ELO1 = 0.0, 5.0
+LOWER, UPPER = sprt_bounds(0.05, 0.05)
+
+
+def test_all_wins_cross_the_upper_bound():
+    assert sprt_llr(30, 0, 0, ELO0, ELO1) >= UPPER
+
+
+def test_all_losses_cross_the_lower_bound():
+    assert sprt_llr(0, 0, 30, ELO0, ELO1) <= LOWER
+
+
+def test_wins_and_draws_without_losses_move_the_ratio():
+    assert sprt_llr(10, 5, 0, ELO0, ELO1) > 0
+    assert sprt_llr(0, 5, 10, ELO0, ELO1) < 0
+
+
+@pytest.mark.parametrize('record', [(0, 0, 0), (5, 0, 5), (0, 10, 0)])
+def test_even_records_decide_nothing(record):
+    assert LOWER < sprt_llr(*record, ELO0, ELO1) < UPPER
+
+
+def test_ratio_follows_the_normal_approximation():
+    #60 wins, 20 draws and 20 losses, against the formula written out
+    w, d = 0.6, 0.2
+    score = w + d / 2
+    variance = (w + d / 4 - score * score) / 100
+    s0, s1 = 0.5, 1 / (1 + 10 ** (-ELO1 / 400))
+    assert sprt_llr(60, 20, 20, ELO0, ELO1) == pytest.approx((s1 - s0) * (2 * score - s0 - s1) / (2 * variance))
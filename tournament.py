@@ -0,0 +1,382 @@
+#Headless tournament runner.
+#
+# Plays games between agents without the pygame window, spread over a process
+# pool, and reports win rates plus the average nodes and time per move.
+#
+#   python tournament.py --games 20                      # the six GUI matchups
+#   python tournament.py --matchup 2 --matchup 6 --games 50 --workers 8
+#   python tournament.py --pair alphabeta:3:4 alphabeta:2:4 --games 40 --json out.json
+#   python tournament.py --pair alphabeta:3:5 alphabeta:3:4 --sprt --elo0 0 --elo1 30
+#
+# A player is search:heuristic:depth[:options], search being minimax, alphabeta,
+# tree or improved, options letters switching on search features (see OPTIONS).
+# Colors alternate every game and each game pair starts from its own seeded
+# random opening.
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import as_completed
+
+from bitboard import BitboardState, BitboardGameState
+
+SEARCHES = ('minimax', 'alphabeta', 'tree', 'improved')
+HEURISTIC_NAMES = {0: 'None', 1: 'Off1', 2: 'Def1', 3: 'Off2', 4: 'Def2'}
+# option letter -> agent keyword
+# ('b' probes the endgame tablebase generated for the board and rules, see tablebase.py;
+# 'o' plays from the opening book built for them, picking book moves by weight, see book.py;
+# 's' tries the proof-number solver first when few pieces are left, see solver.py)
+OPTIONS = {'q': 'quiescence', 'p': 'pvs', 'l': 'lmr', 'f': 'futility', 't': 'threats', 'b': 'tablebase',
+           'o': 'book', 's': 'solver'}
+# the option letters a search does not take
+UNSUPPORTED = {'minimax': set(OPTIONS) - {'o'}, 'tree': {'s'}}
+# search counters (AlphaBetaSearch.stats()) summed per player and reported per move
+COUNTERS = ('cutoffs', 'first_move_cutoffs', 'quiescence_nodes', 'researches', 'aspiration_researches',
+            'reductions', 'reduction_researches', 'futility_prunes', 'race_leaves', 'extensions',
+            'tablebase_hits')
+
+
+class PlayerSpec:
+    #one side of a matchup: search algorithm, heuristic number, depth and option letters
+    def __init__(self, search, heuristic, depth, options=''):
+        if search not in SEARCHES:
+            raise ValueError("unknown search %r, expected one of %s" % (search, ', '.join(SEARCHES)))
+        unknown = set(options) - set(OPTIONS)
+        if unknown or set(options) & UNSUPPORTED.get(search, set()):
+            raise ValueError("unknown options %r for %s" % (options, search))
+        #tree scores GameState's heuristics (0-2), the others State's (0-4)
+        heuristics = (BitboardGameState if search == 'tree' else BitboardState).heuristics
+        if heuristic not in heuristics:
+            raise ValueError("unknown heuristic %r for %s, expected one of %s" % (heuristic, search,
+                                                                                  sorted(heuristics)))
+        self.search = search
+        self.heuristic = heuristic
+        self.depth = depth
+        self.options = options
+
+    @classmethod
+    def parse(cls, text):
+        search, heuristic, depth, *options = text.split(':')
+        return cls(search, int(heuristic), int(depth), ''.join(options))
+
+    @property
+    def keywords(self):
+        keywords = {OPTIONS[letter]: True for letter in self.options}
+        if keywords.get('tablebase'):
+            #tree plays GameState rules (no captures), the others State rules
+            from tablebase import find_tablebase
+            keywords['tablebase'] = find_tablebase(8, 8, captures=self.search != 'tree')
+        if keywords.get('book'):
+            from book import find_book
+            keywords['book'] = find_book(8, 8, captures=self.search != 'tree')
+            keywords['book_random'] = True
+        return keywords
+
+    @property
+    def label(self):
+        name = {'minimax': 'Minimax', 'alphabeta': 'Alpha-beta', 'tree': 'Tree', 'improved': 'Improved'}
+        label = "%s (%s) d%d" % (name[self.search], HEURISTIC_NAMES.get(self.heuristic, self.heuristic), self.depth)
+        return label + (" +" + self.options if self.options else '')
+
+
+# the GUI's six matchups (game phases 5-10 in StrategicGame.run), player 1 plays black
+MATCHUPS = {
+    1: (PlayerSpec('minimax', 1, 3), PlayerSpec('alphabeta', 1, 4)),
+    2: (PlayerSpec('alphabeta', 3, 4), PlayerSpec('alphabeta', 2, 4)),
+    3: (PlayerSpec('alphabeta', 4, 4), PlayerSpec('alphabeta', 1, 4)),
+    4: (PlayerSpec('alphabeta', 3, 4), PlayerSpec('alphabeta', 1, 4)),
+    5: (PlayerSpec('alphabeta', 4, 4), PlayerSpec('alphabeta', 2, 4)),
+    6: (PlayerSpec('alphabeta', 3, 4), PlayerSpec('alphabeta', 4, 4)),
+}
+
+
+def initial_board():
+    return [[1] * 8, [1] * 8] + [[0] * 8 for _ in range(4)] + [[2] * 8, [2] * 8]
+
+
+def agent_move(spec, board, turn):
+    #plays one move for spec; returns (new board, nodes searched, search counters)
+    if spec.search == 'minimax':
+        from engine import MinimaxAgent
+        agent = MinimaxAgent(board, turn, spec.depth, spec.heuristic, bitboard=True, **spec.keywords)
+        state, nodes, _ = agent.minimax_decision()
+    elif spec.search == 'alphabeta':
+        from engine import AlphaBetaAgent
+        agent = AlphaBetaAgent(board, turn, spec.depth, spec.heuristic, in_place=True, **spec.keywords)
+        state, nodes, _ = agent.alpha_beta_decision()
+    elif spec.search == 'tree':
+        from minimax_agent import TreeSearchAgent
+        agent = TreeSearchAgent(board, turn, spec.depth, spec.heuristic, in_place=True, **spec.keywords)
+        state, nodes, _ = agent.find_best_move()
+    else:
+        from alpha_beta_agent import ImprovedSearchAgent
+        agent = ImprovedSearchAgent(board, turn, spec.depth, spec.heuristic, in_place=True, **spec.keywords)
+        state, nodes, _ = agent.get_best_move()
+    stats = getattr(agent, 'search_stats', {})
+    return state.getMatrix(), nodes, {name: stats[name] for name in COUNTERS if name in stats}
+
+
+def random_opening(seed, plies):
+    #a reproducible random start: plies random moves from the initial board
+    rng = random.Random(seed)
+    state = BitboardState.from_matrix(initial_board())
+    for _ in range(plies):
+        moves = state.generate_moves()
+        if not moves or state.winner:
+            break
+        state.make(rng.choice(moves))
+    return state.getMatrix(), state.turn
+
+
+def play_game(black, white, seed, opening_plies=2, max_moves=300):
+    # Plays one game; returns the winner (1, 2 or 0 for a draw) and per-side
+    # totals of moves, nodes, seconds and search counters. The agents' prints are swallowed.
+    random.seed(seed)
+    board, turn = random_opening(seed, opening_plies)
+    specs = {1: black, 2: white}
+    totals = {1: [0, 0, 0.0, {}], 2: [0, 0, 0.0, {}]}
+    winner = 0
+    for _ in range(max_moves):
+        state = BitboardState.from_matrix(board, turn)
+        if state.winner or not state.generate_moves():
+            winner = state.winner
+            break
+        start = time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            board, nodes, counters = agent_move(specs[turn], board, turn)
+        totals[turn][0] += 1
+        totals[turn][1] += nodes
+        totals[turn][2] += time.process_time() - start
+        for name, count in counters.items():
+            totals[turn][3][name] = totals[turn][3].get(name, 0) + count
+        turn = 2 if turn == 1 else 1
+    else:
+        winner = BitboardState.from_matrix(board, turn).winner
+    return winner, totals
+
+
+def _play_task(task):
+    key, game, a, b, seed, opening_plies, max_moves = task
+    #odd games swap colors so both players get black equally often
+    black, white = (b, a) if game % 2 else (a, b)
+    winner, totals = play_game(black, white, seed, opening_plies, max_moves)
+    a_color = 2 if game % 2 else 1
+    return key, winner, a_color, totals
+
+
+def new_result(a, b):
+    return {'a': a.label, 'b': b.label, 'games': 0, 'a_wins': 0, 'b_wins': 0, 'draws': 0,
+            'moves': [0, 0], 'nodes': [0, 0], 'time': [0.0, 0.0], 'counters': [{}, {}]}
+
+
+def record_game(result, winner, a_color, totals):
+    #adds one game's outcome and per-side totals to a result dict
+    result['games'] += 1
+    if winner == a_color:
+        result['a_wins'] += 1
+    elif winner:
+        result['b_wins'] += 1
+    else:
+        result['draws'] += 1
+    for side, color in ((0, a_color), (1, 3 - a_color)):
+        moves, nodes, seconds, counters = totals[color]
+        result['moves'][side] += moves
+        result['nodes'][side] += nodes
+        result['time'][side] += seconds
+        for name, count in counters.items():
+            result['counters'][side][name] = result['counters'][side].get(name, 0) + count
+
+
+def run_tournament(pairings, games, workers=None, seed=0, opening_plies=2, max_moves=300, progress=None):
+    # pairings: {key: (PlayerSpec a, PlayerSpec b)}; returns {key: result dict}.
+    # Games 2k and 2k + 1 share an opening seed and swap colors.
+    from parallel import get_executor
+    tasks = [(key, game, a, b, seed * 100003 + game // 2, opening_plies, max_moves)
+             for key, (a, b) in pairings.items() for game in range(games)]
+    results = {key: new_result(a, b) for key, (a, b) in pairings.items()}
+    if workers == 1:
+        outcomes = map(_play_task, tasks)
+    else:
+        outcomes = get_executor(workers).map(_play_task, tasks)
+    for key, winner, a_color, totals in outcomes:
+        result = results[key]
+        record_game(result, winner, a_color, totals)
+        if progress is not None:
+            progress(key, result)
+    for result in results.values():
+        summarize(result)
+    return results
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    # Log-likelihood ratio of H1 (elo difference = elo1) against H0 (= elo0) for
+    # a win/draw/loss record, with the normal approximation of the mean game
+    # score used by fishtest/cutechess. A record with no spread (every game won,
+    # lost or drawn) gets half a win and half a loss added, so one-sided matches
+    # still move the ratio instead of having no variance.
+    games = wins + draws + losses
+    if not games:
+        return 0.0
+    score, variance = _score_variance(wins, draws, losses)
+    if variance <= 0:
+        score, variance = _score_variance(wins + 0.5, draws, losses + 0.5)
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def _score_variance(wins, draws, losses):
+    #mean game score and the variance of that mean
+    games = wins + draws + losses
+    w, d = wins / games, draws / games
+    score = w + d / 2
+    return score, (w + d / 4 - score * score) / games
+
+
+def sprt_bounds(alpha, beta):
+    #(lower, upper) LLR bounds for false-positive rate alpha and false-negative rate beta
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def run_sprt(a, b, elo0=0.0, elo1=5.0, alpha=0.05, beta=0.05, max_games=20000, workers=None, seed=0,
+             opening_plies=2, max_moves=300, report=None):
+    # Plays a against b until the sequential probability ratio test decides
+    # between H0 (a is elo0 stronger than b) and H1 (a is elo1 stronger), or
+    # max_games are played. Games are kept in flight on the pool and report
+    # (default: print) gets a line with the running record and LLR per game.
+    # Returns a result dict as run_tournament does, plus the test outcome.
+    from parallel import get_executor, pool_size
+    report = print if report is None else report
+    lower, upper = sprt_bounds(alpha, beta)
+    workers = pool_size(workers)
+    executor = get_executor(workers)
+    in_flight = 2 * workers
+    result = new_result(a, b)
+    result.update({'elo0': elo0, 'elo1': elo1, 'alpha': alpha, 'beta': beta, 'llr': 0.0,
+                   'bounds': [lower, upper], 'decision': 'inconclusive'})
+
+    def task(game):
+        return ('sprt', game, a, b, seed * 100003 + game // 2, opening_plies, max_moves)
+
+    submitted = 0
+    pending = set()
+    while submitted < min(in_flight, max_games):
+        pending.add(executor.submit(_play_task, task(submitted)))
+        submitted += 1
+    try:
+        while pending:
+            done = next(as_completed(pending))
+            pending.discard(done)
+            _, winner, a_color, totals = done.result()
+            record_game(result, winner, a_color, totals)
+            llr = sprt_llr(result['a_wins'], result['draws'], result['b_wins'], elo0, elo1)
+            result['llr'] = llr
+            report("games %d  W-D-L %d-%d-%d  LLR %.3f [%.3f, %.3f]" % (
+                result['games'], result['a_wins'], result['draws'], result['b_wins'], llr, lower, upper))
+            if llr >= upper:
+                result['decision'] = 'H1'
+                break
+            if llr <= lower:
+                result['decision'] = 'H0'
+                break
+            if submitted < max_games:
+                pending.add(executor.submit(_play_task, task(submitted)))
+                submitted += 1
+    finally:
+        for future in pending:
+            future.cancel()
+    return summarize(result)
+
+
+def summarize(result):
+    #adds win rates and per-move averages to a result dict
+    games = result['games'] or 1
+    result['a_win_rate'] = (result['a_wins'] + 0.5 * result['draws']) / games
+    result['b_win_rate'] = (result['b_wins'] + 0.5 * result['draws']) / games
+    for side, name in ((0, 'a'), (1, 'b')):
+        moves = result['moves'][side] or 1
+        result[name + '_nodes_per_move'] = result['nodes'][side] / moves
+        result[name + '_time_per_move'] = result['time'][side] / moves
+    return result
+
+
+def format_results(results):
+    lines = []
+    for key, r in results.items():
+        lines.append("Match %s: %s vs %s" % (key, r['a'], r['b']))
+        lines.append("  games %d  wins %d-%d  draws %d  win rate %.1f%% / %.1f%%" % (
+            r['games'], r['a_wins'], r['b_wins'], r['draws'], 100 * r['a_win_rate'], 100 * r['b_win_rate']))
+        lines.append("  avg nodes/move %.0f / %.0f  avg time/move %.3fs / %.3fs" % (
+            r['a_nodes_per_move'], r['b_nodes_per_move'], r['a_time_per_move'], r['b_time_per_move']))
+        for side, name in ((0, r['a']), (1, r['b'])):
+            moves = r['moves'][side] or 1
+            counts = ["%s %.1f" % (counter, count / moves) for counter, count in sorted(r['counters'][side].items())
+                      if count]
+            if counts:
+                lines.append("  per move, %s: %s" % (name, ", ".join(counts)))
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Play Breakthrough agents against each other without the GUI.")
+    parser.add_argument('--games', type=int, default=10, help="games per matchup (default 10)")
+    parser.add_argument('--matchup', type=int, action='append', choices=sorted(MATCHUPS),
+                        help="one of the GUI matchups 1-6, may be repeated (default: all six)")
+    parser.add_argument('--pair', nargs=2, action='append', metavar=('A', 'B'),
+                        help="a custom matchup of two search:heuristic:depth[:options] players, may be repeated")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0, help="base seed for openings and heuristics")
+    parser.add_argument('--opening-plies', type=int, default=2, help="random plies before the agents take over")
+    parser.add_argument('--max-moves', type=int, default=300, help="moves after which a game is a draw")
+    parser.add_argument('--json', help="also write the results to this file")
+    sprt = parser.add_argument_group('SPRT', "stop a single matchup as soon as the Elo question is decided")
+    sprt.add_argument('--sprt', action='store_true', help="run a sequential probability ratio test")
+    sprt.add_argument('--elo0', type=float, default=0.0, help="H0: A is elo0 stronger than B (default 0)")
+    sprt.add_argument('--elo1', type=float, default=5.0, help="H1: A is elo1 stronger than B (default 5)")
+    sprt.add_argument('--alpha', type=float, default=0.05, help="false positive rate (default 0.05)")
+    sprt.add_argument('--beta', type=float, default=0.05, help="false negative rate (default 0.05)")
+    sprt.add_argument('--max-games', type=int, default=20000, help="give up after this many games")
+    return parser.parse_args(argv)
+
+
+def build_pairings(args):
+    pairings = {}
+    for number in args.matchup or ([] if args.pair else sorted(MATCHUPS)):
+        pairings[number] = MATCHUPS[number]
+    for i, (a, b) in enumerate(args.pair or [], 1):
+        pairings['custom%d' % i] = (PlayerSpec.parse(a), PlayerSpec.parse(b))
+    return pairings
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.sprt:
+        pairings = build_pairings(args)
+        if len(pairings) != 1:
+            print("--sprt needs exactly one --matchup or --pair", file=sys.stderr)
+            return 2
+        key, (a, b) = next(iter(pairings.items()))
+        result = run_sprt(a, b, args.elo0, args.elo1, args.alpha, args.beta, args.max_games, args.workers,
+                          args.seed, args.opening_plies, args.max_moves)
+        print(format_results({key: result}))
+        print("SPRT: %s (LLR %.3f, bounds %.3f/%.3f)" % (result['decision'], result['llr'], *result['bounds']))
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(result, f, indent=2)
+        return 0
+    results = run_tournament(build_pairings(args), args.games, args.workers, args.seed,
+                             args.opening_plies, args.max_moves)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
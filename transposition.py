@@ -0,0 +1,231 @@
+#Fixed-size transposition tables for the in-place alpha-beta search.
+#
+# Entries are indexed by the low bits of a position's Zobrist key and store the
+# full key, so a different position landing in the same slot is detected (and
+# counted as a collision) instead of being trusted.
+
+import struct
+
+# bound types: the stored score is exact, a lower bound (fail high) or an upper bound (fail low)
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# replacement policies
+ALWAYS = 'always'   # newest entry wins
+DEPTH = 'depth'     # keep the deeper entry unless it is left over from an earlier search
+
+# rough size of one stored entry (slot + tuple + ints) used to turn a memory cap into a slot count
+ENTRY_BYTES = 120
+
+
+class TranspositionTable:
+
+    def __init__(self, size=1 << 16, replacement=DEPTH, max_memory_mb=None):
+        # size (int): number of slots, rounded down to a power of two
+        # replacement (str): ALWAYS or DEPTH
+        # max_memory_mb (float): caps the slot count by an approximate memory budget
+        if replacement not in (ALWAYS, DEPTH):
+            raise ValueError("unknown replacement policy: %r" % (replacement,))
+        if max_memory_mb is not None:
+            size = min(size, int(max_memory_mb * 1024 * 1024) // ENTRY_BYTES)
+        size = 1 << max(0, size.bit_length() - 1)
+        self.size = size
+        self.mask = size - 1
+        self.replacement = replacement
+        self.slots = [None] * size
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.reset_stats()
+
+    def new_search(self):
+        #ages the current entries so DEPTH replacement lets a new search overwrite them
+        self.generation += 1
+
+    def probe(self, key):
+        #returns (depth, bound, score, move) for key, or None
+        self.probes += 1
+        entry = self.slots[key & self.mask]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            self.misses += 1
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry[1], entry[2], entry[3], entry[4]
+
+    def store(self, key, depth, bound, score, move):
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is not None:
+            if (self.replacement == DEPTH and entry[0] != key and entry[5] == self.generation
+                    and entry[1] > depth):
+                return
+            self.overwrites += 1
+        self.stores += 1
+        self.slots[index] = (key, depth, bound, score, move, self.generation)
+
+    def used_slots(self):
+        return sum(1 for entry in self.slots if entry is not None)
+
+    def stats(self):
+        return {
+            'size': self.size,
+            'used': self.used_slots(),
+            'probes': self.probes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
+
+
+# Shared-memory layout: two header words (stop flag, generation), then three
+# 64-bit words per slot: key ^ score ^ data, score (float bits), data.
+# Writers never lock: a reader recomputes the key from the three words, so a
+# slot torn by two processes writing at once fails the check and reads as a miss.
+_HEADER_WORDS = 2
+_SLOT_WORDS = 3
+# data word: move (13 bits, 0x1FFF = none), bound (2), depth (8), generation (16), valid bit
+_NO_MOVE = 0x1FFF
+_MOVE_BITS, _BOUND_SHIFT, _DEPTH_SHIFT, _GENERATION_SHIFT = 0x1FFF, 13, 15, 23
+_VALID = 1 << 39
+
+
+class SharedTranspositionTable:
+    # TranspositionTable held in multiprocessing.shared_memory so several processes
+    # (Lazy SMP helpers, see parallel.py) can read and write the same entries.
+    # The creating process owns the block and must close() it; the others attach by name.
+
+    def __init__(self, size=1 << 16, replacement=DEPTH, max_memory_mb=None, name=None):
+        from multiprocessing import shared_memory
+        if replacement not in (ALWAYS, DEPTH):
+            raise ValueError("unknown replacement policy: %r" % (replacement,))
+        if max_memory_mb is not None:
+            size = min(size, int(max_memory_mb * 1024 * 1024) // (8 * _SLOT_WORDS))
+        size = 1 << max(0, size.bit_length() - 1)
+        self.size = size
+        self.mask = size - 1
+        self.replacement = replacement
+        self.owner = name is None
+        nbytes = 8 * (_HEADER_WORDS + _SLOT_WORDS * size)
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.shm.buf[:nbytes] = bytes(nbytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.words = self.shm.buf.cast('Q')
+        self.reset_stats()
+
+    def __reduce__(self):
+        #pickles as a handle: the receiving process attaches to the same block
+        return (attach_shared_table, (self.name, self.size, self.replacement))
+
+    reset_stats = TranspositionTable.reset_stats
+
+    @property
+    def generation(self):
+        return self.words[1]
+
+    def new_search(self):
+        #only the owner (the main search) ages the table; helpers share its generation
+        if self.owner:
+            self.words[1] = (self.words[1] + 1) & 0xFFFF
+
+    @property
+    def stop_requested(self):
+        return self.words[0] != 0
+
+    def request_stop(self, stop=True):
+        #the stop flag the Lazy SMP helpers poll
+        self.words[0] = 1 if stop else 0
+
+    def clear(self):
+        words = self.words
+        for i in range(_HEADER_WORDS, len(words)):
+            words[i] = 0
+        self.reset_stats()
+
+    def probe(self, key):
+        #returns (depth, bound, score, move) for key, or None
+        self.probes += 1
+        words = self.words
+        i = _HEADER_WORDS + _SLOT_WORDS * (key & self.mask)
+        check, score_bits, data = words[i], words[i + 1], words[i + 2]
+        if not data:
+            self.misses += 1
+            return None
+        if check ^ score_bits ^ data != key:
+            self.misses += 1
+            self.collisions += 1
+            return None
+        self.hits += 1
+        move = data & _MOVE_BITS
+        return ((data >> _DEPTH_SHIFT) & 0xFF, (data >> _BOUND_SHIFT) & 3, _bits_score(score_bits),
+                None if move == _NO_MOVE else move)
+
+    def store(self, key, depth, bound, score, move):
+        words = self.words
+        i = _HEADER_WORDS + _SLOT_WORDS * (key & self.mask)
+        generation = words[1]
+        old = words[i + 2]
+        if old:
+            if (self.replacement == DEPTH and words[i] ^ words[i + 1] ^ old != key
+                    and (old >> _GENERATION_SHIFT) & 0xFFFF == generation
+                    and (old >> _DEPTH_SHIFT) & 0xFF > depth):
+                return
+            self.overwrites += 1
+        self.stores += 1
+        data = ((_NO_MOVE if move is None else move) | bound << _BOUND_SHIFT
+                | min(max(depth, 0), 0xFF) << _DEPTH_SHIFT | generation << _GENERATION_SHIFT | _VALID)
+        score_bits = _score_bits(score)
+        words[i] = key ^ score_bits ^ data
+        words[i + 1] = score_bits
+        words[i + 2] = data
+
+    def used_slots(self):
+        words = self.words
+        return sum(1 for i in range(_HEADER_WORDS + 2, len(words), _SLOT_WORDS) if words[i])
+
+    stats = TranspositionTable.stats
+
+    def close(self):
+        #detaches; the owner also frees the block
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+_attached = {}
+
+
+def attach_shared_table(name, size, replacement=DEPTH):
+    #the process's attachment to a shared table, made once per block
+    if name not in _attached:
+        _attached[name] = SharedTranspositionTable(size, replacement, name=name)
+    return _attached[name]
+
+
+def _score_bits(score):
+    return struct.unpack('<Q', struct.pack('<d', score))[0]
+
+
+def _bits_score(bits):
+    return struct.unpack('<d', struct.pack('<Q', bits))[0]
+